@@ -0,0 +1,107 @@
+# benchmarks/startup_time.py
+
+import subprocess
+import argparse
+import json
+import sys
+import os
+
+# Import budget per entry point, in milliseconds (cumulative, best of N fresh interpreters)
+STARTUP_BUDGETS_MS = {
+    "main": 50,
+    "core.strategy_registry": 50,
+    "core.broker": 100,
+    "jobs.run_buy": 150,
+    "jobs.run_exit": 150,
+    "jobs.scheduler": 250,
+    "jobs.backtester": 1500,
+}
+
+# Heavy dependencies an entry point must not load at import time
+FORBIDDEN_IMPORTS = {
+    "main": ["pandas", "alpaca_trade_api", "yfinance", "requests"],
+    "core.strategy_registry": ["pandas", "alpaca_trade_api", "yfinance"],
+    "core.broker": ["alpaca_trade_api"],
+    "jobs.run_buy": ["pandas", "alpaca_trade_api", "yfinance", "requests"],
+    "jobs.run_exit": ["pandas", "alpaca_trade_api", "yfinance", "requests"],
+    "jobs.backtester": ["alpaca_trade_api", "yfinance", "requests"],
+}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(module: str) -> dict:
+    """
+    Import `module` in a fresh interpreter with -X importtime and return
+    {"total_ms": cumulative time of the module, "modules": {name: cumulative_ms}}.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        if cumulative.isdigit():
+            modules[name.strip()] = int(cumulative) / 1000
+    return {"total_ms": modules.get(module, 0.0), "modules": modules}
+
+
+def run_benchmark(modules: list, repeat: int = 5, top: int = 5) -> dict:
+    """
+    Best-of-`repeat` import time per module, its slowest top-level
+    dependencies, and any forbidden heavy imports.
+    """
+    # Modules the bare interpreter loads (site, .pth hooks) aren't the entry point's cost
+    startup = set(measure_import("sys")["modules"])
+
+    report = {}
+    for module in modules:
+        runs = [measure_import(module) for _ in range(repeat)]
+        best = min(runs, key=lambda run: run["total_ms"])
+        top_level = {
+            name: ms for name, ms in best["modules"].items()
+            if "." not in name and name != module and name not in startup
+        }
+        report[module] = {
+            "total_ms": round(best["total_ms"], 1),
+            "budget_ms": STARTUP_BUDGETS_MS.get(module),
+            "slowest": dict(sorted(top_level.items(), key=lambda item: -item[1])[:top]),
+            "forbidden": [name for name in FORBIDDEN_IMPORTS.get(module, []) if name in best["modules"]],
+        }
+    return report
+
+
+def print_report(report: dict) -> bool:
+    ok = True
+    print(f"{'module':<26}{'import ms':>10}{'budget':>9}  slowest dependencies")
+    for module, stats in report.items():
+        over = stats["budget_ms"] is not None and stats["total_ms"] > stats["budget_ms"]
+        ok = ok and not over and not stats["forbidden"]
+        slowest = ", ".join(f"{name} {ms:.0f}" for name, ms in stats["slowest"].items())
+        budget = f"{stats['budget_ms']}" if stats["budget_ms"] is not None else "-"
+        flag = "❌" if over or stats["forbidden"] else "✅"
+        print(f"{flag} {module:<24}{stats['total_ms']:>10.1f}{budget:>9}  {slowest}")
+        if stats["forbidden"]:
+            print(f"   ⚠️ loads {', '.join(stats['forbidden'])} at import time")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure per-module import cost against startup budgets")
+    parser.add_argument("modules", nargs="*", default=list(STARTUP_BUDGETS_MS), help="Modules to import (default: all budgeted entry points)")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module (best run is kept)")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.modules, repeat=args.repeat)
+    ok = print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    sys.exit(0 if ok else 1)
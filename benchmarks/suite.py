@@ -0,0 +1,311 @@
+# benchmarks/suite.py
+
+import contextlib
+import tracemalloc
+import platform
+import argparse
+import tempfile
+import time
+import json
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Measure compute, not the on-disk OHLCV cache (read when core.data_provider is imported)
+os.environ.setdefault("DATA_CACHE", "0")
+
+from benchmarks.synthetic import synthetic_frames, SYNTHETIC_START
+
+BASELINE_FILE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# Data source name the fake provider is registered under
+SYNTHETIC_SOURCE = "synthetic"
+
+# Slower per-call workloads only see the first few symbols
+SCALAR_SYMBOLS = 10
+
+BACKTEST_CONFIG = {
+    "strategy": "volume_breakout",
+    "volume_multiplier": 2.0,
+    "lookback_days": 5,
+    "profit_pct": 0.05,
+    "loss_pct": 0.03,
+}
+
+
+# ---------- WORKLOADS ----------
+# Each takes the synthetic frames, does its setup, and returns
+# (unit name, units per run, run function) so only run() is timed.
+
+def backtest_workload(frames):
+    import pandas as pd
+    from core.data_provider import PANEL_PROVIDERS
+    from core.fakes import FakeDataProvider
+    from core.panel import Panel
+    from jobs.backtester import run_backtest
+
+    provider = FakeDataProvider(frames)
+    PANEL_PROVIDERS[SYNTHETIC_SOURCE] = lambda symbols, start, end, dtype=None: Panel.from_frames(provider(symbols, start, end), dtype=dtype)
+
+    first, last = min(f.index[0] for f in frames.values()), max(f.index[-1] for f in frames.values())
+    config = {
+        **BACKTEST_CONFIG,
+        "tickers": list(frames),
+        "data_source": SYNTHETIC_SOURCE,
+        "start_date": first.strftime("%Y-%m-%d"),
+        "end_date": (last + pd.Timedelta(days=1)).strftime("%Y-%m-%d"),
+    }
+    return "symbol-days", sum(len(f) for f in frames.values()), lambda: run_backtest(dict(config))
+
+
+def simulate_exit_workload(frames):
+    from jobs.backtester import simulate_exit, EXIT_HORIZON
+
+    entries = []
+    for data in list(frames.values())[:SCALAR_SYMBOLS]:
+        for i in range(0, len(data) - 1, 10):
+            entries.append((float(data["Close"].iloc[i]), data.iloc[i + 1:i + 1 + EXIT_HORIZON].copy()))
+
+    def run():
+        for entry_price, window in entries:
+            simulate_exit(entry_price, window, BACKTEST_CONFIG["profit_pct"], BACKTEST_CONFIG["loss_pct"])
+    return "exits", len(entries), run
+
+
+def simulate_exits_workload(frames):
+    from jobs.backtester import simulate_exits
+
+    arrays = []
+    for data in frames.values():
+        positions = list(range(0, len(data) - 1, 5))
+        close = data["Close"].to_numpy(dtype=float)
+        arrays.append((positions, close[positions], data["High"].to_numpy(dtype=float), data["Low"].to_numpy(dtype=float), close))
+
+    def run():
+        for positions, prices, high, low, close in arrays:
+            simulate_exits(positions, prices, high, low, close, BACKTEST_CONFIG["profit_pct"], BACKTEST_CONFIG["loss_pct"])
+    return "exits", sum(len(positions) for positions, *_ in arrays), run
+
+
+def run_backtest_on_day_workload(frames):
+    from strategies.high_volume_breakout import run_backtest_on_day
+
+    lookback = BACKTEST_CONFIG["lookback_days"]
+    windows = [
+        (symbol, data.iloc[i - lookback:i + 1])
+        for symbol, data in list(frames.items())[:SCALAR_SYMBOLS]
+        for i in range(lookback, len(data))
+    ]
+
+    def run():
+        for symbol, window in windows:
+            run_backtest_on_day(window, symbol, BACKTEST_CONFIG)
+    return "symbol-days", len(windows), run
+
+
+def strategy_run_workload(frames):
+    from core.panel import Panel
+    from core.indicators import DEFAULT_STATE_DIR
+    from strategies.high_volume_breakout import run
+
+    panel = Panel.from_frames(frames)
+    config = {**BACKTEST_CONFIG, "tickers": list(frames), "state_name": "benchmark"}
+    state_file = os.path.join(DEFAULT_STATE_DIR, "benchmark.json")
+
+    def cold_run():
+        # No saved state: every symbol rebuilds its rolling average from the panel
+        if os.path.exists(state_file):
+            os.remove(state_file)
+        run(config, panel)
+    return "symbols", len(frames), cold_run
+
+
+def trade_store_workload(frames, rows: int = 5000):
+    from core.sqlite_logger import init_db, log_trade, flush_trades
+
+    init_db()
+    symbols = list(frames)
+
+    def run():
+        for i in range(rows):
+            action = "buy" if i % 2 == 0 else "sell"
+            log_trade(symbols[(i // 2) % len(symbols)], action, 1, 100.0 + i % 7, strategy="benchmark")
+        flush_trades()
+    return "rows", rows, run
+
+
+def execution_workload(frames):
+    from core.execution import execute_signals
+    from core.fakes import FakeBroker
+
+    broker = FakeBroker({symbol: float(data["Close"].iloc[-1]) for symbol, data in frames.items()})
+    signals = [{"symbol": symbol, "action": "buy", "qty": 1} for symbol in frames]
+
+    def run():
+        execute_signals(signals, side="buy", strategy_name="benchmark", broker=broker,
+                        notify=lambda message: None, log=lambda **trade: None)
+    return "orders", len(signals), run
+
+
+WORKLOADS = {
+    "backtest": backtest_workload,
+    "simulate_exit": simulate_exit_workload,
+    "simulate_exits": simulate_exits_workload,
+    "run_backtest_on_day": run_backtest_on_day_workload,
+    "strategy_run": strategy_run_workload,
+    "trade_store": trade_store_workload,
+    "execution": execution_workload,
+}
+
+
+# ---------- HARNESS ----------
+@contextlib.contextmanager
+def scratch_dir():
+    """
+    Run inside a throwaway working directory (results, logs, state and the
+    trade DB all land there) that can still read the repo's data/.
+    """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench-") as work:
+        os.symlink(os.path.join(ROOT, "data"), os.path.join(work, "data"))
+        os.chdir(work)
+        try:
+            yield work
+        finally:
+            os.chdir(cwd)
+
+
+def measure(name: str, frames: dict, repeat: int) -> dict:
+    """
+    Best-of-`repeat` wall time and throughput for one workload, plus the
+    peak Python-tracked memory of one extra traced run.
+    """
+    with open(os.devnull, "w") as quiet, contextlib.redirect_stdout(quiet):
+        unit, units, run = WORKLOADS[name](frames)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    best = min(timings)
+    return {
+        "unit": unit,
+        "units": units,
+        "seconds": round(best, 4),
+        "throughput": round(units / best, 1) if best > 0 else None,
+        "peak_mb": round(peak / 2 ** 20, 2),
+    }
+
+
+def run_suite(names: list, symbols: int, days: int, seed: int = 0, repeat: int = 3) -> dict:
+    frames = synthetic_frames(symbols, days, seed)
+    results = {}
+    with scratch_dir():
+        for name in names:
+            print(f"⏱️ {name}...")
+            results[name] = measure(name, frames, repeat)
+    return {
+        "params": {"symbols": symbols, "days": days, "seed": seed, "start": SYNTHETIC_START},
+        "environment": environment(),
+        "results": results,
+    }
+
+
+def environment() -> dict:
+    import numpy as np
+    import pandas as pd
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> dict:
+    """
+    Per workload: throughput and peak memory relative to the baseline, and
+    whether either moved the wrong way by more than `tolerance`.
+    """
+    comparison = {}
+    for name, stats in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous.get("throughput") or not stats["throughput"]:
+            continue
+        speed = stats["throughput"] / previous["throughput"]
+        memory = stats["peak_mb"] / previous["peak_mb"] if previous.get("peak_mb") else 1.0
+        comparison[name] = {
+            "speed": round(speed, 3),
+            "memory": round(memory, 3),
+            "regressed": speed < 1 - tolerance or memory > 1 + tolerance,
+        }
+    return comparison
+
+
+def print_report(report: dict, comparison: dict = None) -> bool:
+    comparison = comparison or {}
+    params = report["params"]
+    print(f"\n📊 {params['symbols']} symbols × {params['days']} days (seed {params['seed']})")
+    print(f"{'workload':<22}{'throughput':>14}  {'unit':<12}{'best s':>9}{'peak MB':>9}  vs baseline")
+    ok = True
+    for name, stats in report["results"].items():
+        against = comparison.get(name)
+        if against:
+            ok = ok and not against["regressed"]
+            flag = "❌" if against["regressed"] else "✅"
+            vs = f"{flag} {against['speed']:.2f}x speed, {against['memory']:.2f}x memory"
+        else:
+            vs = "-"
+        print(f"{name:<22}{stats['throughput']:>14,.1f}  {stats['unit'] + '/s':<12}{stats['seconds']:>9.3f}{stats['peak_mb']:>9.1f}  {vs}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline throughput/memory benchmarks on synthetic market data")
+    parser.add_argument("workloads", nargs="*", default=list(WORKLOADS), help=f"Workloads to run (default: all of {', '.join(WORKLOADS)})")
+    parser.add_argument("--symbols", type=int, default=200, help="Synthetic symbols")
+    parser.add_argument("--days", type=int, default=1000, help="Business days per symbol")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per workload (best is kept)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run to --baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown / memory growth before failing")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.workloads if name not in WORKLOADS]
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(unknown)}")
+
+    report = run_suite(args.workloads, args.symbols, args.days, args.seed, args.repeat)
+
+    comparison = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("params") == report["params"]:
+            comparison = compare(report, baseline, args.tolerance)
+        else:
+            print(f"⚠️ Baseline {args.baseline} was recorded with {baseline.get('params')}; not comparing")
+
+    ok = print_report(report, comparison)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({**report, "comparison": comparison}, f, indent=2)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,41 @@
+# benchmarks/synthetic.py
+
+import numpy as np
+import pandas as pd
+
+# First bar of every synthetic series
+SYNTHETIC_START = "2015-01-02"
+
+
+def synthetic_symbols(count: int) -> list:
+    return [f"SYN{i:04d}" for i in range(count)]
+
+
+def synthetic_ohlcv(index: int, days: int, seed: int = 0, start: str = SYNTHETIC_START) -> pd.DataFrame:
+    """
+    Daily OHLCV for one synthetic symbol: a log-normal random walk with
+    intraday range and occasional volume spikes. Each symbol draws from its
+    own (seed, index) stream, so a symbol's bars don't depend on how many
+    other symbols are generated.
+    """
+    rng = np.random.default_rng([seed, index])
+    dates = pd.bdate_range(start, periods=days)
+
+    close = 20 + 180 * rng.random() * np.exp(np.cumsum(rng.normal(0.0002, 0.02, days)))
+    open_ = close * (1 + rng.normal(0, 0.005, days))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.03, days))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.03, days))
+    volume = rng.lognormal(13, 0.4, days)
+    volume[rng.random(days) < 0.05] *= rng.uniform(2, 6)
+
+    return pd.DataFrame(
+        {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": np.round(volume)},
+        index=dates
+    )
+
+
+def synthetic_frames(symbols: int, days: int, seed: int = 0) -> dict:
+    """
+    {symbol: OHLCV frame} for `symbols` synthetic tickers × `days` business days.
+    """
+    return {symbol: synthetic_ohlcv(i, days, seed) for i, symbol in enumerate(synthetic_symbols(symbols))}
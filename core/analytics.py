@@ -0,0 +1,152 @@
+# core/analytics.py
+
+import numpy as np
+import pandas as pd
+
+# Default capital model for equity curves built from independent trades
+DEFAULT_INITIAL_CAPITAL = 100_000.0
+DEFAULT_POSITION_SIZE = 10_000.0
+TRADING_DAYS_PER_YEAR = 252
+
+
+def build_calendar(frames: dict) -> pd.DatetimeIndex:
+    """
+    Sorted union of all symbols' bar dates.
+    """
+    if not frames:
+        return pd.DatetimeIndex([])
+    return pd.DatetimeIndex(sorted(set().union(*(frame.index for frame in frames.values()))))
+
+
+def equity_metrics(equity, initial_capital: float, invested=None, traded_notional: float = 0.0) -> dict:
+    """
+    Return, risk and activity statistics for a daily equity series.
+    `invested` is the capital held in positions on each day (for exposure) and
+    `traded_notional` the total bought plus sold dollars (for turnover).
+    """
+    equity = np.asarray(equity, dtype=float)
+    if len(equity) < 2:
+        return {
+            "final_equity": float(initial_capital), "total_return": 0.0, "cagr": 0.0,
+            "sharpe": 0.0, "sortino": 0.0, "max_drawdown": 0.0,
+            "exposure": 0.0, "turnover": 0.0,
+        }
+
+    prev = np.concatenate(([initial_capital], equity[:-1]))
+    returns = equity / prev - 1
+    mean, std = returns.mean(), returns.std()
+    downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2))
+    annualize = np.sqrt(TRADING_DAYS_PER_YEAR)
+
+    drawdown = equity / np.maximum.accumulate(np.maximum(equity, initial_capital)) - 1
+    years = len(equity) / TRADING_DAYS_PER_YEAR
+    growth = equity[-1] / initial_capital
+    exposure = np.mean(np.asarray(invested, dtype=float) / equity) * 100 if invested is not None else 0.0
+
+    return {
+        "final_equity": float(equity[-1]),
+        "total_return": float((growth - 1) * 100),
+        "cagr": float((growth ** (1 / years) - 1) * 100) if growth > 0 else -100.0,
+        "sharpe": float(mean / std * annualize) if std > 0 else 0.0,
+        "sortino": float(mean / downside * annualize) if downside > 0 else 0.0,
+        "max_drawdown": float(drawdown.min() * 100),
+        "exposure": float(exposure),
+        "turnover": float(traded_notional / equity.mean() / years),
+    }
+
+
+class EquityCurve:
+    """
+    Portfolio equity curve assembled symbol by symbol from trade arrays.
+
+    Every trade buys `position_size` dollars of stock at the entry close,
+    is marked to market on each close it is held, and is sold at its exit
+    price. Overlapping trades simply add up; nothing caps total exposure.
+    All per-trade work is vectorized with cumulative sums and np.add.at over
+    the shared calendar, so adding a symbol costs O(days + trades).
+    """
+
+    def __init__(self, calendar: pd.DatetimeIndex, initial_capital: float = DEFAULT_INITIAL_CAPITAL,
+                 position_size: float = DEFAULT_POSITION_SIZE, sectors: dict | None = None):
+        self.calendar = pd.DatetimeIndex(calendar)
+        self.initial_capital = float(initial_capital)
+        self.position_size = float(position_size)
+        self.sectors = sectors or {}
+        n = len(self.calendar)
+        self.pnl = np.zeros(n)
+        self._invested_delta = np.zeros(n + 1)
+        self.traded_notional = 0.0
+        self.symbol_stats = []
+
+    def add_symbol(self, symbol, dates, close, entry_positions, exit_positions, exit_prices, outcomes):
+        """
+        Fold one symbol's trades into the curve. Positions index that symbol's
+        own rows (dates/close); exit position -1 means the trade never exited.
+        Wins are the trades whose outcome is "win", as in the headline win rate.
+        """
+        entry_positions = np.asarray(entry_positions, dtype=np.int64)
+        exit_positions = np.asarray(exit_positions, dtype=np.int64)
+        exit_prices = np.asarray(exit_prices, dtype=float)
+        outcomes = np.asarray(outcomes)
+        close = np.asarray(close, dtype=float)
+
+        closed = exit_positions >= 0
+        entry_positions, exit_positions, exit_prices = entry_positions[closed], exit_positions[closed], exit_prices[closed]
+        outcomes = outcomes[closed]
+        if len(entry_positions) == 0:
+            return
+
+        n = len(close)
+        entry_prices = close[entry_positions]
+        shares = self.position_size / entry_prices
+
+        # Shares held on each close strictly between entry and exit day
+        held_delta = np.zeros(n + 1)
+        np.add.at(held_delta, entry_positions + 1, shares)
+        np.add.at(held_delta, exit_positions, -shares)
+        held = np.cumsum(held_delta)[:n]
+
+        pnl = np.zeros(n)
+        pnl[1:] = held[1:] * np.diff(close)
+        # Exit day: from the prior close to the exit fill
+        np.add.at(pnl, exit_positions, shares * (exit_prices - close[exit_positions - 1]))
+
+        calendar_rows = self.calendar.get_indexer(pd.DatetimeIndex(dates))
+        np.add.at(self.pnl, calendar_rows, pnl)
+
+        # Capital committed from entry day through exit day
+        np.add.at(self._invested_delta, calendar_rows[entry_positions], self.position_size)
+        np.add.at(self._invested_delta, calendar_rows[exit_positions] + 1, -self.position_size)
+
+        trade_pnl = shares * (exit_prices - entry_prices)
+        self.traded_notional += float(self.position_size * len(shares) + (shares * exit_prices).sum())
+        self.symbol_stats.append({
+            "symbol": symbol,
+            "sector": self.sectors.get(symbol, "Unknown"),
+            "trades": int(len(shares)),
+            "wins": int((outcomes == "win").sum()),
+            "pnl": float(trade_pnl.sum()),
+        })
+
+    # ---------- Results ----------
+    def equity(self) -> pd.Series:
+        return pd.Series(self.initial_capital + np.cumsum(self.pnl), index=self.calendar, name="equity")
+
+    def invested(self) -> pd.Series:
+        return pd.Series(np.cumsum(self._invested_delta)[:len(self.calendar)], index=self.calendar, name="invested")
+
+    def metrics(self) -> dict:
+        """
+        Portfolio-level statistics over the calendar.
+        """
+        return equity_metrics(self.equity().to_numpy(), self.initial_capital, self.invested().to_numpy(), self.traded_notional)
+
+    def by_symbol(self) -> pd.DataFrame:
+        stats = pd.DataFrame(self.symbol_stats, columns=["symbol", "sector", "trades", "wins", "pnl"])
+        stats["win_rate"] = (stats["wins"] / stats["trades"] * 100).round(2)
+        return stats.sort_values("pnl", ascending=False, ignore_index=True)
+
+    def by_sector(self) -> pd.DataFrame:
+        stats = self.by_symbol().groupby("sector", as_index=False)[["trades", "wins", "pnl"]].sum()
+        stats["win_rate"] = (stats["wins"] / stats["trades"] * 100).round(2)
+        return stats.sort_values("pnl", ascending=False, ignore_index=True)
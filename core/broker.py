@@ -1,17 +1,52 @@
-import alpaca_trade_api as tradeapi
+import os
+import time
+import threading
 from config.settings import ALPACA_API_KEY, ALPACA_SECRET_KEY, BASE_URL
+from core import instrumentation as metrics
 
-api = tradeapi.REST(ALPACA_API_KEY, ALPACA_SECRET_KEY, BASE_URL)
+# REST client, created on first use so importing this module stays cheap
+_api = None
+_api_lock = threading.Lock()
+
+
+def get_api():
+    """
+    Shared Alpaca REST client, constructed (and alpaca_trade_api imported) on first call.
+    """
+    global _api
+    if _api is None:
+        with _api_lock:
+            if _api is None:
+                import alpaca_trade_api as tradeapi
+                _api = tradeapi.REST(ALPACA_API_KEY, ALPACA_SECRET_KEY, BASE_URL)
+    return _api
+
+
+def __getattr__(name):
+    # Keeps `from core.broker import api` / `broker.api` working without an eager client
+    if name == "api":
+        return get_api()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Quote cache lifetime and symbols per snapshots request
+QUOTE_TTL_SECONDS = float(os.getenv("QUOTE_TTL_SECONDS", "5"))
+SNAPSHOT_BATCH_SIZE = int(os.getenv("SNAPSHOT_BATCH_SIZE", "200"))
+
+# symbol -> (price, monotonic fetch time)
+_quote_cache = {}
+_quote_lock = threading.Lock()
 
 def buy_stock(symbol, qty):
     try:
-        api.submit_order(
-            symbol=symbol,
-            qty=qty,
-            side='buy',
-            type='market',
-            time_in_force='gtc'
-        )
+        metrics.increment("broker.orders")
+        with metrics.timer("broker.submit_order", symbol):
+            get_api().submit_order(
+                symbol=symbol,
+                qty=qty,
+                side='buy',
+                type='market',
+                time_in_force='gtc'
+            )
         print(f"✅ Order placed: BUY {symbol} x{qty}")
     except Exception as e:
         print(f"❌ Failed to BUY {symbol}: {e}")
@@ -20,13 +55,15 @@ def buy_stock(symbol, qty):
 
 def sell_stock(symbol: str, qty: int):
     try:
-        order = api.submit_order(
-            symbol=symbol,
-            qty=qty,
-            side="sell",
-            type="market",
-            time_in_force="day"
-        )
+        metrics.increment("broker.orders")
+        with metrics.timer("broker.submit_order", symbol):
+            order = get_api().submit_order(
+                symbol=symbol,
+                qty=qty,
+                side="sell",
+                type="market",
+                time_in_force="day"
+            )
         print(f"✅ Order placed: SELL {symbol} x{qty}")
         return order
     except Exception as e:
@@ -39,5 +76,68 @@ def sell_stock(symbol: str, qty: int):
 
 
 def get_current_price(symbol):
-    return float(api.get_latest_trade(symbol).price)
+    price = get_latest_prices([symbol]).get(symbol)
+    if price is None:
+        metrics.increment("broker.latest_trade_requests")
+        with metrics.timer("broker.get_latest_trade", symbol):
+            price = float(get_api().get_latest_trade(symbol).price)
+    return price
+
+
+def _snapshot_price(snapshot):
+    """
+    Last trade price from a snapshot, falling back to the latest bar close.
+    """
+    if snapshot is None:
+        return None
+    for attr in ("latest_trade", "minute_bar", "daily_bar"):
+        entry = getattr(snapshot, attr, None)
+        if entry is None:
+            continue
+        price = getattr(entry, "price", None) or getattr(entry, "close", None)
+        if price:
+            return float(price)
+    return None
+
+
+def get_latest_prices(symbols, max_age: float = QUOTE_TTL_SECONDS) -> dict:
+    """
+    Latest price for many symbols via the multi-symbol snapshots endpoint.
+    Quotes younger than max_age seconds are served from an in-process cache,
+    so repeated lookups within one job run don't hit the API again.
+    Symbols without a usable snapshot are left out of the result.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    now = time.monotonic()
+
+    prices = {}
+    missing = []
+    with _quote_lock:
+        for symbol in symbols:
+            cached = _quote_cache.get(symbol)
+            if cached and now - cached[1] < max_age:
+                prices[symbol] = cached[0]
+            else:
+                missing.append(symbol)
+
+    metrics.increment("broker.quote_cache_hits", len(prices))
+    for i in range(0, len(missing), SNAPSHOT_BATCH_SIZE):
+        chunk = missing[i:i + SNAPSHOT_BATCH_SIZE]
+        metrics.increment("broker.snapshot_requests")
+        with metrics.timer("broker.get_snapshots"):
+            snapshots = get_api().get_snapshots(chunk)
+        fetched_at = time.monotonic()
+        with _quote_lock:
+            for symbol in chunk:
+                price = _snapshot_price(snapshots.get(symbol))
+                if price is None:
+                    continue
+                _quote_cache[symbol] = (price, fetched_at)
+                prices[symbol] = price
+
+    return prices
+
 
+def clear_quote_cache():
+    with _quote_lock:
+        _quote_cache.clear()
@@ -0,0 +1,341 @@
+# core/data_cache.py
+
+import os
+import time
+import datetime
+import numpy as np
+import pandas as pd
+from core import instrumentation as metrics
+
+# Cache location and freshness window for the latest (still mutable) bar
+DEFAULT_CACHE_DIR = os.getenv("DATA_CACHE_DIR", "cache/ohlcv")
+DEFAULT_CACHE_TTL = int(os.getenv("DATA_CACHE_TTL", "900"))  # seconds
+
+
+def _to_date(value):
+    return None if value is None else pd.Timestamp(value).normalize()
+
+
+def _to_str(value):
+    return None if value is None else value.strftime("%Y-%m-%d")
+
+
+def _bar_dates(frame: pd.DataFrame) -> pd.DatetimeIndex:
+    """
+    Naive dates of each bar, whatever index shape the provider returned
+    (yfinance: DatetimeIndex, alpaca: (symbol, timestamp) MultiIndex in UTC).
+    """
+    dates = pd.DatetimeIndex(frame.index.get_level_values(-1))
+    if dates.tz is not None:
+        dates = dates.tz_convert(None)
+    return dates.normalize()
+
+
+class OHLCVCache:
+    """
+    On-disk OHLCV cache with one pickled frame per symbol, keyed by data source
+    and adjustment mode. Each file records the date range it covers so only the
+    missing head/tail of a request is fetched.
+
+    Bars dated on or after the day of the last fetch are treated as mutable:
+    they are served from cache for `ttl` seconds and refetched afterwards.
+    """
+
+    def __init__(self, source: str, adjustment: str = "raw", root: str = DEFAULT_CACHE_DIR,
+                 ttl: int = DEFAULT_CACHE_TTL, clock=time.time):
+        self.directory = os.path.join(root, source, adjustment)
+        self.ttl = ttl
+        self.clock = clock
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.directory, f"{symbol}.pkl")
+
+    def load(self, symbol: str):
+        """
+        Return (frame, meta) for a cached symbol, or (None, None).
+        """
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None, None
+        try:
+            frame = pd.read_pickle(path)
+        except Exception as e:
+            print(f"⚠️ Dropping unreadable cache file for {symbol}: {e}")
+            os.remove(path)
+            return None, None
+        meta = frame.attrs.get("cache", {})
+        return frame, meta
+
+    def store(self, symbol: str, frame: pd.DataFrame, meta: dict):
+        frame.attrs["cache"] = meta
+        path = self._path(symbol)
+        tmp_path = f"{path}.tmp"
+        frame.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, symbols=None):
+        """
+        Evict cached symbols (all of them when symbols is None).
+        """
+        if symbols is None:
+            symbols = [name[:-4] for name in os.listdir(self.directory) if name.endswith(".pkl")]
+        for symbol in symbols:
+            path = self._path(symbol)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _missing_ranges(self, meta, start, end):
+        """
+        Date ranges [from, to) that must be fetched to serve [start, end).
+        A start of None means "from the first available bar".
+        """
+        if not meta:
+            return [(start, end)]
+
+        cached_start = _to_date(meta.get("start"))
+        cached_end = _to_date(meta.get("end"))
+        fetched_at = meta.get("fetched_at", 0)
+
+        # Bars from the fetch day onward may still change until the TTL expires
+        if self.clock() - fetched_at >= self.ttl:
+            fetch_day = pd.Timestamp(datetime.datetime.fromtimestamp(fetched_at)).normalize()
+            cached_end = min(cached_end, fetch_day)
+
+        ranges = []
+        if cached_start is not None and (start is None or start < cached_start):
+            ranges.append((start, cached_start))
+        if end > cached_end:
+            ranges.append((cached_end, end))
+        return ranges
+
+    def get(self, symbols, start, end, fetch_fn) -> dict:
+        """
+        Serve [start, end) for every symbol, calling fetch_fn(symbols, start, end)
+        once per distinct missing range. end=None means "through today".
+        """
+        start = _to_date(start)
+        end = _to_date(end) if end is not None else pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+
+        cached = {}
+        pending = {}
+        for symbol in symbols:
+            frame, meta = self.load(symbol)
+            cached[symbol] = (frame, meta)
+            missing_ranges = self._missing_ranges(meta, start, end)
+            metrics.increment("cache.misses" if missing_ranges else "cache.hits")
+            for missing in missing_ranges:
+                pending.setdefault(missing, []).append(symbol)
+
+        fetched = {}
+        for (fetch_start, fetch_end), group in pending.items():
+            print(f"🌐 Fetching {len(group)} symbols for {_to_str(fetch_start) or 'start'} → {_to_str(fetch_end)}")
+            data = fetch_fn(group, _to_str(fetch_start), _to_str(fetch_end))
+            if not data:
+                # Nothing came back for the whole group: don't mark the range as covered
+                print(f"⚠️ No data returned for {len(group)} symbols; serving cached bars only")
+                continue
+            for symbol in group:
+                fetched.setdefault(symbol, []).append((fetch_start, fetch_end, data.get(symbol)))
+
+        now = self.clock()
+        result = {}
+        for symbol in symbols:
+            frame, meta = cached[symbol]
+            updates = fetched.get(symbol, [])
+
+            if updates:
+                merged, merged_meta = self._merge(frame, meta, updates, start, end, now)
+                # Unchanged when nothing came back for this symbol
+                if merged_meta is not meta:
+                    frame, meta = merged, merged_meta
+                    self.store(symbol, frame, meta)
+            if frame is None:
+                continue
+
+            dates = _bar_dates(frame)
+            mask = dates < end
+            if start is not None:
+                mask &= dates >= start
+            served = frame[mask].copy()
+            served.attrs = {}
+            if not served.empty:
+                result[symbol] = served
+
+        return result
+
+    def _merge(self, frame, meta, updates, start, end, now):
+        """
+        Fold freshly fetched ranges into the cached frame and widen its coverage.
+        Cached bars inside a refetched range are replaced. Only ranges that
+        actually returned bars count as covered; a symbol that got nothing
+        keeps its old coverage, so the next run asks again.
+        """
+        received = [(fetch_start, fetch_end, data) for fetch_start, fetch_end, data in updates
+                    if data is not None and not data.empty]
+        if not received:
+            return frame, meta
+
+        parts = []
+        if frame is not None:
+            dates = _bar_dates(frame)
+            keep = np.ones(len(frame), dtype=bool)
+            for fetch_start, fetch_end, _ in received:
+                in_range = dates < fetch_end
+                if fetch_start is not None:
+                    in_range &= dates >= fetch_start
+                keep &= ~in_range
+            parts.append(frame[keep])
+        parts.extend(data for _, _, data in received)
+
+        merged = pd.concat([part for part in parts if not part.empty])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+
+        cached_start = _to_date(meta.get("start")) if meta else None
+        cached_end = _to_date(meta.get("end")) if meta else None
+        for fetch_start, fetch_end, _ in received:
+            if not meta or fetch_start is None or (cached_start is not None and fetch_start < cached_start):
+                cached_start = fetch_start
+            cached_end = fetch_end if cached_end is None else max(cached_end, fetch_end)
+        tail_fetched = any(fetch_end >= end for _, fetch_end, _ in received)
+
+        merged_meta = {
+            "start": _to_str(cached_start),
+            "end": _to_str(cached_end),
+            "fetched_at": now if tail_fetched or not meta else meta.get("fetched_at", now),
+        }
+        return merged, merged_meta
+
+
+# ---------- MINUTE BARS ----------
+DEFAULT_MINUTE_CACHE_DIR = os.getenv("MINUTE_CACHE_DIR", "cache/minute")
+
+# Longest span requested at once (yfinance serves at most 8 days of 1m bars per call)
+MINUTE_FETCH_DAYS = int(os.getenv("MINUTE_FETCH_DAYS", "7"))
+
+# Regular session close in exchange time (as core.data_provider.MARKET_CLOSE);
+# a session saved before it may still be missing bars
+DEFAULT_SESSION_CLOSE = pd.Timedelta(hours=16)
+
+
+def split_sessions(frame: pd.DataFrame, timezone: str) -> dict:
+    """
+    Split minute bars into {session date: frame}, with the index in `timezone`.
+    """
+    if frame is None or frame.empty:
+        return {}
+    index = frame.index
+    if isinstance(index, pd.MultiIndex):
+        index = index.get_level_values(-1)
+    index = pd.DatetimeIndex(index)
+    index = index.tz_localize("UTC") if index.tz is None else index
+    frame = frame.set_axis(index.tz_convert(timezone))
+    days = frame.index.date
+    return {day: frame[days == day] for day in dict.fromkeys(days)}
+
+
+class MinuteBarCache:
+    """
+    On-disk minute bars with one pickled frame per symbol and session day, so
+    a stream only ever loads the days it is on. Today's session is refetched
+    once it is older than `ttl` seconds. Each file records whether the
+    session was complete when saved (saved after the close, or holding a bar
+    at the close); complete past sessions are kept for good, partial ones
+    are refetched. A day a symbol had no bars is stored empty, so it isn't
+    requested again.
+    """
+
+    def __init__(self, source: str, root: str = DEFAULT_MINUTE_CACHE_DIR, ttl: int = DEFAULT_CACHE_TTL,
+                 timezone: str = "America/New_York", clock=time.time, session_close=DEFAULT_SESSION_CLOSE):
+        self.directory = os.path.join(root, source)
+        self.ttl = ttl
+        self.timezone = timezone
+        self.clock = clock
+        self.session_close = session_close
+
+    def _path(self, symbol: str, day: datetime.date) -> str:
+        return os.path.join(self.directory, symbol, f"{day.isoformat()}.pkl")
+
+    def _close_time(self, day: datetime.date) -> pd.Timestamp:
+        return pd.Timestamp(day).tz_localize(self.timezone) + self.session_close
+
+    def load(self, symbol: str, day: datetime.date):
+        """
+        The cached session frame (possibly empty), or None when it must be fetched.
+        """
+        path = self._path(symbol, day)
+        now = self.clock()
+        today = pd.Timestamp(now, unit="s", tz=self.timezone).date()
+        try:
+            if day >= today and now - os.path.getmtime(path) > self.ttl:
+                return None
+            frame = pd.read_pickle(path)
+            complete = frame.attrs.pop("session_complete", None)
+            if complete is None:
+                # Written before sessions were flagged: judge by when it was saved
+                complete = os.path.getmtime(path) >= self._close_time(day).timestamp()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Dropping unreadable minute cache file for {symbol} {day}: {e}")
+            os.remove(path)
+            return None
+
+        if day < today and not complete:
+            # Saved while that session was still trading: bars are missing
+            return None
+        return frame
+
+    def store(self, symbol: str, day: datetime.date, frame: pd.DataFrame):
+        path = self._path(symbol, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        close = self._close_time(day)
+        frame = frame.copy(deep=False)
+        frame.attrs["session_complete"] = bool(
+            self.clock() >= close.timestamp() or (not frame.empty and frame.index[-1] >= close)
+        )
+        tmp_path = f"{path}.tmp"
+        frame.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+
+    def iter_days(self, symbols, days, fetch_fn):
+        """
+        Yield (day, {symbol: minute frame}) for each day in order. Missing
+        sessions are fetched with one fetch_fn(symbols, start, end) call per
+        window of up to MINUTE_FETCH_DAYS days, starting at the earliest
+        missing day, so at most one window is held in memory.
+        """
+        symbols = list(symbols)
+        days = list(days)
+        for i in range(0, len(days), MINUTE_FETCH_DAYS):
+            window = days[i:i + MINUTE_FETCH_DAYS]
+            loaded = {day: {} for day in window}
+            first_missing = {}
+            for symbol in symbols:
+                for day in window:
+                    frame = self.load(symbol, day)
+                    if frame is None:
+                        first_missing[symbol] = day
+                        break
+                    loaded[day][symbol] = frame
+            metrics.increment("cache.minute.misses", len(first_missing))
+            metrics.increment("cache.minute.hits", len(symbols) - len(first_missing))
+
+            if first_missing:
+                fetch_start = min(first_missing.values())
+                fetch_end = window[-1] + datetime.timedelta(days=1)
+                data = fetch_fn(list(first_missing), fetch_start.isoformat(), fetch_end.isoformat()) or {}
+                for symbol in first_missing:
+                    if symbol not in data:
+                        # Nothing came back: leave uncached so the next run retries
+                        continue
+                    sessions = split_sessions(data[symbol], self.timezone)
+                    for day in window:
+                        if day < fetch_start:
+                            continue
+                        frame = sessions.get(day, data[symbol].iloc[:0])
+                        self.store(symbol, day, frame)
+                        loaded[day][symbol] = frame
+
+            for day in window:
+                yield day, {symbol: frame for symbol, frame in loaded[day].items() if not frame.empty}
@@ -1,7 +1,13 @@
 # core/data_provider.py
 
 from typing import List, Literal
+from concurrent.futures import ThreadPoolExecutor
+from core.panel import Panel
+from core import instrumentation as metrics
+import numpy as np
 import pandas as pd
+import datetime
+import time
 import os
 
 # Define valid data source types
@@ -10,25 +16,167 @@ DataSourceType = Literal["yfinance", "alpaca"]
 # Get default source from environment variable or fallback to 'yfinance'
 DEFAULT_SOURCE_RAW = os.getenv("DATA_SOURCE", "yfinance")
 
+# On-disk OHLCV cache is on unless DATA_CACHE=0
+DEFAULT_USE_CACHE = os.getenv("DATA_CACHE", "1") != "0"
+
+# Batched yfinance download settings (symbols per request, parallel requests, retries)
+YF_CHUNK_SIZE = int(os.getenv("YF_CHUNK_SIZE", "50"))
+YF_MAX_WORKERS = int(os.getenv("YF_MAX_WORKERS", "4"))
+YF_RETRIES = int(os.getenv("YF_RETRIES", "3"))
+YF_BACKOFF_SECONDS = float(os.getenv("YF_BACKOFF_SECONDS", "1.0"))
+
 # ---------- YFINANCE IMPLEMENTATION ----------
-def get_data_yfinance(symbols: List[str], start: str, end: str) -> dict:
+def _split_yfinance_frame(combined: pd.DataFrame, symbols: List[str]) -> dict:
     """
-    Fetch daily OHLCV data from Yahoo Finance for given symbols and date range.
+    Split a multi-ticker yf.download() frame (columns: Price × Ticker) into the
+    per-symbol frames a single-ticker download would have returned.
     """
-    import yfinance as yf
     result = {}
+    if combined is None or combined.empty:
+        return result
+
+    tickers = set(combined.columns.get_level_values(-1))
     for symbol in symbols:
-        df = yf.download(symbol, start=start, end=end, interval="1d", auto_adjust=False)
+        if symbol not in tickers:
+            continue
+        df = combined.xs(symbol, axis=1, level=-1, drop_level=False).dropna(how="all")
         if not df.empty:
             df["Symbol"] = symbol  # Add symbol column for identification
             result[symbol] = df
     return result
 
+def _download_chunk(symbols, start, end, downloader, retries, backoff, interval="1d") -> list:
+    """
+    Download one chunk of symbols in a single request, retrying with
+    exponential backoff only when the request itself fails. Symbols missing
+    from a successful response (delisted, or no bars in the range) are
+    reported once and dropped. Returns the multi-ticker frames received,
+    restricted to the symbols that came back.
+    """
+    for attempt in range(retries + 1):
+        try:
+            metrics.increment("data.yfinance.requests")
+            with metrics.timer("data.yfinance.request"):
+                combined = downloader(
+                    symbols, start=start, end=end, interval=interval, auto_adjust=False,
+                    group_by="column", threads=False, progress=False
+                )
+        except Exception as e:
+            metrics.increment("data.yfinance.errors")
+            print(f"⚠️ yfinance chunk failed ({len(symbols)} symbols, attempt {attempt + 1}): {e}")
+            if attempt < retries:
+                time.sleep(backoff * (2 ** attempt))
+            continue
+
+        frames, received = [], set()
+        if combined is not None and not combined.empty:
+            metrics.increment("data.bytes_fetched", int(combined.memory_usage(index=True).sum()))
+            tickers = combined.columns.get_level_values(-1)
+            received = set(combined.dropna(axis=1, how="all").columns.get_level_values(-1))
+            frames.append(combined.loc[:, tickers.isin(received)])
+
+        missing = [symbol for symbol in symbols if symbol not in received]
+        if missing:
+            print(f"⚠️ No yfinance data for {len(missing)} symbols: {', '.join(missing[:10])}")
+        return frames
+
+    print(f"❌ Giving up on {len(symbols)} symbols after {retries + 1} attempts: {', '.join(list(symbols)[:10])}")
+    return []
+
+def _download_yfinance(symbols, start, end, chunk_size, max_workers, retries, backoff, downloader, interval="1d") -> list:
+    """
+    Multi-ticker frames for all symbols, requested in chunks over a bounded thread pool.
+    """
+    if downloader is None:
+        import yfinance as yf
+        downloader = yf.download
+
+    symbols = list(symbols)
+    chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+    started = time.perf_counter()
+
+    frames = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks) or 1))) as pool:
+        futures = [
+            pool.submit(_download_chunk, chunk, start, end, downloader, retries, backoff, interval)
+            for chunk in chunks
+        ]
+        for future in futures:
+            frames.extend(future.result())
+
+    received = sum(len(set(frame.columns.get_level_values(-1))) for frame in frames)
+    elapsed = time.perf_counter() - started
+    metrics.observe("data.yfinance.download", elapsed * 1000)
+    metrics.increment("data.symbols_fetched", received)
+    print(f"⏱️ yfinance {interval}: {received}/{len(symbols)} symbols in {len(chunks)} chunks, {elapsed:.2f}s")
+    return frames
+
+def get_data_yfinance(
+    symbols: List[str],
+    start: str,
+    end: str,
+    chunk_size: int = YF_CHUNK_SIZE,
+    max_workers: int = YF_MAX_WORKERS,
+    retries: int = YF_RETRIES,
+    backoff: float = YF_BACKOFF_SECONDS,
+    downloader=None
+) -> dict:
+    """
+    Fetch daily OHLCV data from Yahoo Finance for given symbols and date range.
+    Symbols are requested in multi-ticker chunks spread over a bounded thread pool.
+    `downloader` defaults to yf.download and can be swapped for a stub.
+    """
+    result = {}
+    for combined in _download_yfinance(symbols, start, end, chunk_size, max_workers, retries, backoff, downloader):
+        result.update(_split_yfinance_frame(combined, list(dict.fromkeys(combined.columns.get_level_values(-1)))))
+    return result
+
+def get_panel_yfinance(
+    symbols: List[str],
+    start: str,
+    end: str,
+    dtype=np.float32,
+    chunk_size: int = YF_CHUNK_SIZE,
+    max_workers: int = YF_MAX_WORKERS,
+    retries: int = YF_RETRIES,
+    backoff: float = YF_BACKOFF_SECONDS,
+    downloader=None
+) -> Panel:
+    """
+    Same download as get_data_yfinance(), packed straight into a Panel
+    without building per-symbol frames.
+    """
+    frames = _download_yfinance(symbols, start, end, chunk_size, max_workers, retries, backoff, downloader)
+    if not frames:
+        return Panel.from_wide(None, dtype=dtype)
+    return Panel.from_wide(pd.concat(frames, axis=1), dtype=dtype)
+
+def get_minute_data_yfinance(
+    symbols: List[str],
+    start: str,
+    end: str,
+    chunk_size: int = YF_CHUNK_SIZE,
+    max_workers: int = YF_MAX_WORKERS,
+    retries: int = YF_RETRIES,
+    backoff: float = YF_BACKOFF_SECONDS,
+    downloader=None
+) -> dict:
+    """
+    1-minute OHLCV bars for [start, end) per symbol. Yahoo only serves the
+    last ~30 days of minute bars, at most 8 days per request; callers such
+    as MinuteBarCache ask for a week at a time.
+    """
+    result = {}
+    frames = _download_yfinance(symbols, start, end, chunk_size, max_workers, retries, backoff, downloader, interval="1m")
+    for combined in frames:
+        result.update(_split_yfinance_frame(combined, list(dict.fromkeys(combined.columns.get_level_values(-1)))))
+    return {symbol: frame.droplevel(-1, axis=1) if frame.columns.nlevels > 1 else frame for symbol, frame in result.items()}
+
 # ---------- ALPACA IMPLEMENTATION ----------
-def get_data_alpaca(symbols: List[str], start: str, end: str) -> dict:
+def _fetch_alpaca_bars(symbols: List[str], start: str, end: str, timeframe: str = "day") -> pd.DataFrame:
     """
-    Fetch daily OHLCV data from Alpaca API for given symbols and date range.
-    Requires proper API credentials to be configured.
+    One multi-symbol bars request ("day" or "minute" bars), as Alpaca's long
+    (symbol, timestamp) table. Requires proper API credentials to be configured.
     """
     from alpaca.data.historical import StockHistoricalDataClient
     from alpaca.data.requests import StockBarsRequest
@@ -38,12 +186,25 @@ def get_data_alpaca(symbols: List[str], start: str, end: str) -> dict:
     client = StockHistoricalDataClient()
     request_params = StockBarsRequest(
         symbol_or_symbols=symbols,
-        timeframe=TimeFrame.Day,
+        timeframe=TimeFrame.Minute if timeframe == "minute" else TimeFrame.Day,
         start=datetime.datetime.fromisoformat(start),
         end=datetime.datetime.fromisoformat(end)
     )
-    bars = client.get_stock_bars(request_params).df
+    metrics.increment("data.alpaca.requests")
+    with metrics.timer("data.alpaca.request"):
+        bars = client.get_stock_bars(request_params).df
+    metrics.increment("data.bytes_fetched", int(bars.memory_usage(index=True).sum()))
+    metrics.increment("data.symbols_fetched", len(symbols))
+    return bars
+
+def get_data_alpaca(symbols: List[str], start: str, end: str) -> dict:
+    """
+    Fetch daily OHLCV data from Alpaca API for given symbols and date range.
+    Requires proper API credentials to be configured.
+    """
+    return _split_alpaca_bars(_fetch_alpaca_bars(symbols, start, end), symbols)
 
+def _split_alpaca_bars(bars: pd.DataFrame, symbols: List[str]) -> dict:
     result = {}
     for symbol in symbols:
         symbol_df = bars[bars["symbol"] == symbol].copy()
@@ -52,20 +213,227 @@ def get_data_alpaca(symbols: List[str], start: str, end: str) -> dict:
             result[symbol] = symbol_df
     return result
 
+def get_minute_data_alpaca(symbols: List[str], start: str, end: str) -> dict:
+    """
+    1-minute OHLCV bars from Alpaca for [start, end) per symbol.
+    """
+    bars = _fetch_alpaca_bars(symbols, start, end, timeframe="minute")
+    if "symbol" not in bars.columns and isinstance(bars.index, pd.MultiIndex):
+        bars = bars.reset_index(level="symbol")
+    bars = bars.rename(columns=str.title)
+    return _split_alpaca_bars(bars.rename(columns={"Symbol": "symbol"}), symbols)
+
+def get_panel_alpaca(symbols: List[str], start: str, end: str, dtype=np.float32) -> Panel:
+    """
+    Daily bars from Alpaca packed straight into a Panel.
+    """
+    bars = _fetch_alpaca_bars(symbols, start, end)
+    if "symbol" in bars.columns:
+        bars = bars.set_index("symbol", append=True).swaplevel(0, 1)
+    return Panel.from_long(bars, dtype=dtype)
+
+# Provider lookup used by the unified interface and the cache
+DATA_PROVIDERS = {
+    "yfinance": get_data_yfinance,
+    "alpaca": get_data_alpaca,
+}
+
+# Providers that build a Panel directly
+PANEL_PROVIDERS = {
+    "yfinance": get_panel_yfinance,
+    "alpaca": get_panel_alpaca,
+}
+
+# Providers of raw 1-minute bars, the base every intraday interval is resampled from
+MINUTE_PROVIDERS = {
+    "yfinance": get_minute_data_yfinance,
+    "alpaca": get_minute_data_alpaca,
+}
+
+# Intraday intervals and their pandas resample rules
+INTRADAY_INTERVALS = {"1m": "1min", "5m": "5min", "15m": "15min", "30m": "30min", "1h": "60min"}
+IntervalType = Literal["1m", "5m", "15m", "30m", "1h", "1d"]
+
+# Intraday bars are anchored to the opening bell, so 1h bars run 9:30-10:30, ...
+MARKET_OPEN = pd.Timedelta(hours=9, minutes=30)
+MARKET_CLOSE = pd.Timedelta(hours=16)
+
 # ---------- PUBLIC INTERFACE FUNCTION ----------
 def get_daily_data(
     symbols: List[str],
     start: str,
     end: str,
-    source: DataSourceType = DEFAULT_SOURCE_RAW
+    source: DataSourceType = DEFAULT_SOURCE_RAW,
+    use_cache: bool = DEFAULT_USE_CACHE
 ) -> dict[str, pd.DataFrame]:
     """
     Unified interface to fetch daily stock data.
     Selects data provider based on `source` parameter.
+    With use_cache, bars are served from the local OHLCV cache and only the
+    missing date range is requested from the provider.
     """
-    if source == "yfinance":
-        return get_data_yfinance(symbols, start, end)
-    elif source == "alpaca":
-        return get_data_alpaca(symbols, start, end)
+    fetch_fn = DATA_PROVIDERS.get(source)
+    if fetch_fn is None:
+        raise ValueError(f"Unknown data source: {source}")
+
+    if use_cache:
+        from core.data_cache import OHLCVCache
+        return OHLCVCache(source).get(symbols, start, end, fetch_fn)
+
+    return fetch_fn(symbols, start, end)
+
+
+def get_daily_panel(
+    symbols: List[str],
+    start: str,
+    end: str,
+    source: DataSourceType = DEFAULT_SOURCE_RAW,
+    use_cache: bool = DEFAULT_USE_CACHE,
+    dtype=np.float32
+) -> Panel:
+    """
+    Daily OHLCV for all symbols as one Panel (symbol × date × field) on a shared calendar.
+    Cached bars are packed from the per-symbol cache files; uncached requests
+    are packed directly from the provider's multi-symbol response.
+    """
+    if source not in PANEL_PROVIDERS:
+        raise ValueError(f"Unknown data source: {source}")
+
+    if use_cache:
+        return Panel.from_frames(get_daily_data(symbols, start, end, source=source, use_cache=True), dtype=dtype)
+
+    return PANEL_PROVIDERS[source](symbols, start, end, dtype=dtype)
+
+
+# ---------- INTRADAY ----------
+def resample_bars(frame: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    Aggregate minute bars into `interval` bars (first open, max high, min low,
+    last close, summed volume), labelled by their start time and anchored to
+    the market open. Intervals without any minute bar are dropped.
+    """
+    rule = INTRADAY_INTERVALS.get(interval)
+    if rule is None:
+        raise ValueError(f"Unknown intraday interval: {interval}")
+    if interval == "1m" or frame.empty:
+        return frame
+
+    aggregations = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+    aggregations = {field: how for field, how in aggregations.items() if field in frame.columns}
+    origin = frame.index[0].normalize() + MARKET_OPEN
+    bars = frame[list(aggregations)].resample(rule, label="left", closed="left", origin=origin).agg(aggregations)
+    counts = frame[list(aggregations)[0]].resample(rule, label="left", closed="left", origin=origin).count()
+    return bars[counts.to_numpy() > 0]
+
+def _session_days(start, end) -> list:
+    """
+    Weekdays in [start, end); end=None means through today (market time).
+    Holidays simply come back without bars.
+    """
+    from core.market_calendar import market_today
+    last = pd.Timestamp(end).date() - datetime.timedelta(days=1) if end is not None else market_today()
+    return [day.date() for day in pd.bdate_range(pd.Timestamp(start), pd.Timestamp(last))]
+
+def iter_minute_sessions(
+    symbols: List[str],
+    start: str,
+    end: str = None,
+    source: DataSourceType = DEFAULT_SOURCE_RAW,
+    use_cache: bool = DEFAULT_USE_CACHE
+):
+    """
+    Yield (session date, {symbol: minute bars}) one trading day at a time.
+    With use_cache, sessions come from (and are added to) the per-day minute cache.
+    """
+    from core.data_cache import MinuteBarCache, MINUTE_FETCH_DAYS, split_sessions
+    from core.market_calendar import MARKET_TIMEZONE
+
+    fetch_fn = MINUTE_PROVIDERS.get(source)
+    if fetch_fn is None:
+        raise ValueError(f"Unknown data source: {source}")
+    days = _session_days(start, end)
+
+    if use_cache:
+        yield from MinuteBarCache(source, timezone=MARKET_TIMEZONE).iter_days(symbols, days, fetch_fn)
+        return
+
+    for i in range(0, len(days), MINUTE_FETCH_DAYS):
+        window = days[i:i + MINUTE_FETCH_DAYS]
+        data = fetch_fn(symbols, window[0].isoformat(), (window[-1] + datetime.timedelta(days=1)).isoformat()) or {}
+        sessions = {symbol: split_sessions(frame, MARKET_TIMEZONE) for symbol, frame in data.items()}
+        for day in window:
+            yield day, {symbol: by_day[day] for symbol, by_day in sessions.items() if day in by_day}
+
+def stream_intraday_bars(
+    symbols: List[str],
+    start: str,
+    end: str = None,
+    interval: IntervalType = "1m",
+    source: DataSourceType = DEFAULT_SOURCE_RAW,
+    use_cache: bool = DEFAULT_USE_CACHE,
+    after=None,
+    complete_only: bool = False
+):
+    """
+    Generator of (timestamp, {symbol: {"Open", "High", "Low", "Close", "Volume"}})
+    in time order, resampled to `interval` from 1-minute bars. Only one
+    session is in memory at a time, so multi-week minute histories never
+    have to be materialized. `after` skips bars up to and including a
+    timestamp (e.g. the last bar a strategy has already seen), either one
+    for every symbol or a {symbol: timestamp} dict.
+    With complete_only, a symbol's bar is only yielded once that symbol's
+    data holds a later minute; its newest minute may still be forming.
+    """
+    if interval not in INTRADAY_INTERVALS:
+        raise ValueError(f"Unknown intraday interval: {interval}")
+    if isinstance(after, dict):
+        after = {symbol: pd.Timestamp(timestamp) for symbol, timestamp in after.items()}
     else:
-        raise ValueError(f"Unknown data source: {source}")
\ No newline at end of file
+        after = dict.fromkeys(symbols, pd.Timestamp(after)) if after is not None else {}
+    step = pd.Timedelta(INTRADAY_INTERVALS[interval])
+
+    for _, frames in iter_minute_sessions(symbols, start, end, source=source, use_cache=use_cache):
+        times, owners, rows = [], [], []
+        for symbol, frame in frames.items():
+            bars = resample_bars(frame, interval)
+            if symbol in after:
+                bars = bars[bars.index > after[symbol]]
+            if complete_only and not frame.empty:
+                bars = bars[bars.index + step <= frame.index[-1]]
+            if bars.empty:
+                continue
+            times.append(bars.index.as_unit("ns").asi8)
+            owners.append(np.full(len(bars), symbol, dtype=object))
+            rows.append(bars.reindex(columns=["Open", "High", "Low", "Close", "Volume"]).to_numpy(dtype=float))
+        if not times:
+            continue
+
+        times, owners, rows = np.concatenate(times), np.concatenate(owners), np.concatenate(rows)
+        order = np.argsort(times, kind="stable")
+        timezone = next(iter(frames.values())).index.tz
+        boundaries = np.flatnonzero(np.diff(times[order])) + 1
+        for group in np.split(order, boundaries):
+            timestamp = pd.Timestamp(times[group[0]], tz="UTC").tz_convert(timezone)
+            yield timestamp, {
+                owners[k]: dict(zip(("Open", "High", "Low", "Close", "Volume"), rows[k].tolist()))
+                for k in group
+            }
+
+def get_intraday_data(
+    symbols: List[str],
+    start: str,
+    end: str = None,
+    interval: IntervalType = "5m",
+    source: DataSourceType = DEFAULT_SOURCE_RAW,
+    use_cache: bool = DEFAULT_USE_CACHE
+) -> dict[str, pd.DataFrame]:
+    """
+    Intraday OHLCV per symbol, resampled from cached minute bars. Builds the
+    whole range in memory, so keep it to a few sessions; use
+    stream_intraday_bars() for longer spans.
+    """
+    parts = {}
+    for _, frames in iter_minute_sessions(symbols, start, end, source=source, use_cache=use_cache):
+        for symbol, frame in frames.items():
+            parts.setdefault(symbol, []).append(resample_bars(frame, interval))
+    return {symbol: pd.concat(frames) for symbol, frames in parts.items()}
@@ -0,0 +1,142 @@
+# core/execution.py
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+from core import instrumentation as metrics
+
+# Upper bound on orders in flight at once
+MAX_CONCURRENT_ORDERS = int(os.getenv("MAX_CONCURRENT_ORDERS", "8"))
+
+# Message prefix per order side
+SIDE_ICONS = {"buy": "✅", "sell": "🚪"}
+
+
+def _default_broker():
+    import core.broker as broker
+    return broker
+
+
+def _default_notify(message):
+    from core.notifier import send_telegram
+    send_telegram(message)
+
+
+def _default_log(**trade):
+    from core.sqlite_logger import log_trade
+    log_trade(**trade)
+
+
+def _place_order(broker, side, symbol, qty):
+    # Per-symbol order round trip, whichever broker is plugged in
+    with metrics.timer(f"orders.{side}", symbol):
+        if side == "buy":
+            return broker.buy_stock(symbol, qty)
+        return broker.sell_stock(symbol, qty)
+
+
+def _quote_and_place(broker, side, symbol, qty):
+    # Missing from the batch snapshot: price off the latest trade, then order
+    metrics.increment("orders.quote_fallbacks")
+    try:
+        price = broker.get_current_price(symbol)
+    except Exception as e:
+        raise RuntimeError(f"no quote ({e})") from e
+    _place_order(broker, side, symbol, qty)
+    return price
+
+
+def execute_signals(
+    signals: list,
+    side: str,
+    strategy_name: str,
+    status: str = "executed",
+    env: str = "paper",
+    broker=None,
+    notify=None,
+    log=None,
+    max_workers: int = MAX_CONCURRENT_ORDERS
+) -> list:
+    """
+    Place orders for all signals concurrently and return the filled ones.
+
+    - Quotes for every symbol come from one batched get_latest_prices() call;
+      symbols missing from it fall back to broker.get_current_price()
+    - Orders go out through a bounded thread pool
+    - Alerts and trade logging run on a separate single worker as fills come
+      back, so they never hold up the next order
+
+    `broker` is anything exposing get_latest_prices/buy_stock/sell_stock
+    (core.broker by default, core.fakes.FakeBroker offline).
+    Signals merged across strategies carry an "allocations" dict of
+    strategy -> qty; each share is logged under its own strategy.
+    """
+    broker = broker or _default_broker()
+    notify = notify or _default_notify
+    log = log or _default_log
+    if not signals:
+        return []
+
+    # 💰 One quote request for the whole batch
+    prices = broker.get_latest_prices([signal["symbol"] for signal in signals])
+
+    fills = []
+    with ThreadPoolExecutor(max_workers=1) as side_effects:
+        def record(signal, price):
+            symbol = signal["symbol"]
+            qty = signal.get("qty", 1)
+            action = signal.get("action", side)
+            # Merged multi-strategy orders log one row per strategy's share
+            allocations = signal.get("allocations") or {strategy_name: qty}
+            tags = ", ".join(allocations)
+            suffix = f" [{tags}]" if len(allocations) > 1 else ""
+            for name, allocated in allocations.items():
+                log(
+                    symbol=symbol,
+                    action=action,
+                    qty=allocated,
+                    price=price,
+                    strategy=name,
+                    env=env,
+                    status=status,
+                    notes=f"strategies={tags}" if suffix else None
+                )
+            # ✅ The fill is logged even if the alert can't go out
+            try:
+                notify(f"{SIDE_ICONS.get(side, '📌')} {action.upper()} {symbol} x{qty} @ ${price:.2f}{suffix}")
+            except Exception as e:
+                print(f"⚠️ Alert for {action.upper()} {symbol} failed: {e}")
+
+        pending = {}  # side-effect future -> symbol
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as orders:
+            futures = {}
+            for signal in signals:
+                symbol = signal["symbol"]
+                place = _place_order if symbol in prices else _quote_and_place
+                futures[orders.submit(place, broker, side, symbol, signal.get("qty", 1))] = signal
+
+            for future in as_completed(futures):
+                signal = futures[future]
+                symbol = signal["symbol"]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    metrics.increment(f"orders.{side}.failed")
+                    print(f"❌ {side.upper()} {symbol} failed: {e}")
+                    pending[side_effects.submit(notify, f"⚠️ {side.upper()} {symbol} failed in {strategy_name}: {e}")] = symbol
+                    continue
+
+                # _quote_and_place returns the fallback price it ordered at
+                price = prices.get(symbol, result)
+
+                metrics.increment(f"orders.{side}.filled")
+                fills.append({**signal, "price": price})
+                pending[side_effects.submit(record, signal, price)] = symbol
+
+    # ✅ Side effects have drained; surface any logging/alert failure
+    for future, symbol in pending.items():
+        error = future.exception()
+        if error is not None:
+            metrics.increment(f"orders.{side}.side_effect_errors")
+            print(f"❌ Logging/alert for {side.upper()} {symbol} failed: {error}")
+
+    return fills
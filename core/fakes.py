@@ -0,0 +1,162 @@
+# core/fakes.py
+
+import threading
+import time
+import pandas as pd
+
+# ✅ Local stand-ins for network services, for offline runs and checks
+
+
+def _bound(value, index) -> pd.Timestamp:
+    """
+    Date bound comparable with `index` (localized when the bars are tz-aware, like minute bars).
+    """
+    bound = pd.Timestamp(value)
+    if index.tz is not None and bound.tz is None:
+        bound = bound.tz_localize(index.tz)
+    return bound
+
+
+class FakeDataProvider:
+    """
+    Drop-in for get_data_yfinance/get_data_alpaca that serves slices of
+    in-memory frames and records every request it receives.
+    """
+
+    def __init__(self, frames: dict):
+        self.frames = frames
+        self.calls = []
+
+    def __call__(self, symbols, start, end) -> dict:
+        self.calls.append((list(symbols), start, end))
+        result = {}
+        for symbol in symbols:
+            frame = self.frames.get(symbol)
+            if frame is None:
+                continue
+            mask = pd.Series(True, index=frame.index)
+            if start is not None:
+                mask &= frame.index >= _bound(start, frame.index)
+            if end is not None:
+                mask &= frame.index < _bound(end, frame.index)
+            sliced = frame[mask.to_numpy()].copy()
+            if not sliced.empty:
+                result[symbol] = sliced
+        return result
+
+
+class StubDownloader:
+    """
+    Offline stand-in for yf.download(). Returns a multi-ticker frame with
+    (Price, Ticker) columns built from in-memory per-symbol OHLCV frames,
+    sleeping `latency` seconds per request to mimic a round trip.
+    """
+
+    def __init__(self, frames: dict, latency: float = 0.0, fail_first: int = 0):
+        self.frames = frames
+        self.latency = latency
+        self.fail_first = fail_first
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, tickers, start=None, end=None, **kwargs) -> pd.DataFrame:
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        with self._lock:
+            self.calls.append(tickers)
+            should_fail = len(self.calls) <= self.fail_first
+        time.sleep(self.latency)
+        if should_fail:
+            raise ConnectionError("stub download failure")
+
+        parts = {}
+        for symbol in tickers:
+            frame = self.frames.get(symbol)
+            if frame is None:
+                continue
+            if start is not None:
+                frame = frame[frame.index >= _bound(start, frame.index)]
+            if end is not None:
+                frame = frame[frame.index < _bound(end, frame.index)]
+            parts[symbol] = frame[["Open", "High", "Low", "Close", "Volume"]]
+
+        if not parts:
+            return pd.DataFrame()
+        combined = pd.concat(parts, axis=1, names=["Ticker", "Price"]).swaplevel(axis=1)
+        return combined.sort_index(axis=1, level=0, sort_remaining=False)
+
+
+class FakeBroker:
+    """
+    Offline stand-in for core.broker: fixed quotes, simulated order latency,
+    and a record of every order placed.
+    """
+
+    def __init__(self, prices: dict, latency: float = 0.0, fail_symbols=()):
+        self.prices = dict(prices)
+        self.latency = latency
+        self.fail_symbols = set(fail_symbols)
+        self.orders = []
+        self.quote_requests = []
+        self._lock = threading.Lock()
+
+    def get_latest_prices(self, symbols) -> dict:
+        symbols = list(symbols)
+        self.quote_requests.append(symbols)
+        return {symbol: self.prices[symbol] for symbol in symbols if symbol in self.prices}
+
+    def get_current_price(self, symbol):
+        return self.prices[symbol]
+
+    def _submit(self, side, symbol, qty):
+        time.sleep(self.latency)
+        if symbol in self.fail_symbols:
+            raise RuntimeError(f"fake rejection for {symbol}")
+        with self._lock:
+            self.orders.append((side, symbol, qty))
+
+    def buy_stock(self, symbol, qty):
+        self._submit("buy", symbol, qty)
+
+    def sell_stock(self, symbol, qty):
+        self._submit("sell", symbol, qty)
+
+
+class FakeQuoteProvider:
+    """
+    Callable quote source for run_exit(config={"quote_provider": ...}) that
+    returns fixed prices and records each bulk request.
+    """
+
+    def __init__(self, prices: dict):
+        self.prices = dict(prices)
+        self.requests = []
+
+    def __call__(self, symbols) -> dict:
+        symbols = list(symbols)
+        self.requests.append(symbols)
+        return {symbol: self.prices[symbol] for symbol in symbols if symbol in self.prices}
+
+
+class StubSink:
+    """
+    Notification sink for core.notifier that records messages instead of
+    sending them; can simulate send latency and rate limiting.
+    """
+
+    name = "stub"
+    max_chars = 4096
+
+    def __init__(self, latency: float = 0.0, rate_limit_first: int = 0, retry_after: float = 0.01):
+        self.latency = latency
+        self.rate_limit_first = rate_limit_first
+        self.retry_after = retry_after
+        self.messages = []
+        self.attempts = 0
+
+    def send(self, text: str):
+        from core.notifier import RateLimited
+        self.attempts += 1
+        time.sleep(self.latency)
+        if self.attempts <= self.rate_limit_first:
+            raise RateLimited(self.retry_after)
+        self.messages.append(text)
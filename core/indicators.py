@@ -0,0 +1,251 @@
+# core/indicators.py
+
+from collections import deque
+import json
+import math
+import os
+import pandas as pd
+
+# ✅ Technical indicators in two forms that agree bar for bar:
+# - vectorized functions over a full history (pandas' O(n) rolling/ewm kernels)
+# - streaming classes with O(1) update() per bar and JSON-serializable state,
+#   so a daily job can carry state forward and only advance the newest bar.
+# Both return NaN until enough bars have been seen.
+
+DEFAULT_STATE_DIR = os.getenv("INDICATOR_STATE_DIR", "cache/indicators")
+
+
+# ---------- VECTORIZED ----------
+def rolling_sum(values: pd.Series, window: int) -> pd.Series:
+    return values.rolling(window).sum()
+
+
+def rolling_mean(values: pd.Series, window: int) -> pd.Series:
+    return values.rolling(window).mean()
+
+
+def rolling_max(values: pd.Series, window: int) -> pd.Series:
+    return values.rolling(window).max()
+
+
+def rolling_min(values: pd.Series, window: int) -> pd.Series:
+    return values.rolling(window).min()
+
+
+def ema(values: pd.Series, span: int) -> pd.Series:
+    """
+    Exponential moving average (alpha = 2 / (span + 1)), seeded with the first value.
+    """
+    return values.ewm(span=span, adjust=False, min_periods=span).mean()
+
+
+def rsi(close: pd.Series, period: int = 14) -> pd.Series:
+    """
+    Wilder's RSI on 0-100.
+    """
+    delta = close.diff()
+    avg_gain = delta.clip(lower=0).ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    avg_loss = (-delta).clip(lower=0).ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
+    """
+    Wilder's average true range. The first bar's true range is High - Low.
+    """
+    prev_close = close.shift(1)
+    true_range = pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+    return true_range.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+
+
+# ---------- STREAMING ----------
+class Indicator:
+    """
+    Base for streaming indicators: update() takes one bar and returns the
+    current value; state() / from_state() round-trip through JSON.
+    """
+
+    fields = ()
+
+    def state(self) -> dict:
+        state = {"type": type(self).__name__}
+        for name in self.fields:
+            value = getattr(self, name)
+            state[name] = list(value) if isinstance(value, deque) else value
+        return state
+
+    @classmethod
+    def from_state(cls, state: dict) -> "Indicator":
+        indicator_cls = INDICATORS[state["type"]] if cls is Indicator else cls
+        indicator = indicator_cls.__new__(indicator_cls)
+        for name in indicator_cls.fields:
+            value = state[name]
+            # JSON turns deques into lists (and their tuples into lists too)
+            if isinstance(value, list):
+                value = deque(tuple(item) if isinstance(item, list) else item for item in value)
+            setattr(indicator, name, value)
+        return indicator
+
+
+class RollingSum(Indicator):
+    fields = ("window", "values", "total")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+
+    def update(self, value: float) -> float:
+        value = float(value)
+        self.values.append(value)
+        self.total += value
+        if len(self.values) > self.window:
+            self.total -= self.values.popleft()
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.total if len(self.values) == self.window else math.nan
+
+
+class RollingMean(RollingSum):
+    @property
+    def value(self) -> float:
+        return self.total / self.window if len(self.values) == self.window else math.nan
+
+
+class RollingMax(Indicator):
+    """
+    Monotonic deque of (bar number, value): amortized O(1) per bar.
+    """
+
+    fields = ("window", "count", "candidates")
+    keep_if = staticmethod(lambda kept, new: kept > new)
+
+    def __init__(self, window: int):
+        self.window = window
+        self.count = 0
+        self.candidates = deque()
+
+    def update(self, value: float) -> float:
+        value = float(value)
+        while self.candidates and not self.keep_if(self.candidates[-1][1], value):
+            self.candidates.pop()
+        self.candidates.append((self.count, value))
+        self.count += 1
+        if self.candidates[0][0] <= self.count - 1 - self.window:
+            self.candidates.popleft()
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.candidates[0][1] if self.count >= self.window else math.nan
+
+
+class RollingMin(RollingMax):
+    keep_if = staticmethod(lambda kept, new: kept < new)
+
+
+class EMA(Indicator):
+    fields = ("span", "count", "current")
+
+    def __init__(self, span: int):
+        self.span = span
+        self.count = 0
+        self.current = math.nan
+
+    def update(self, value: float) -> float:
+        value = float(value)
+        alpha = 2 / (self.span + 1)
+        self.current = value if self.count == 0 else self.current + alpha * (value - self.current)
+        self.count += 1
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.current if self.count >= self.span else math.nan
+
+
+class RSI(Indicator):
+    fields = ("period", "count", "prev_close", "avg_gain", "avg_loss")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.count = 0
+        self.prev_close = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def update(self, close: float) -> float:
+        close = float(close)
+        if self.prev_close is not None:
+            change = close - self.prev_close
+            gain, loss = max(change, 0.0), max(-change, 0.0)
+            if self.count == 0:
+                self.avg_gain, self.avg_loss = gain, loss
+            else:
+                self.avg_gain += (gain - self.avg_gain) / self.period
+                self.avg_loss += (loss - self.avg_loss) / self.period
+            self.count += 1
+        self.prev_close = close
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self.count < self.period:
+            return math.nan
+        if self.avg_loss == 0:
+            return 100.0 if self.avg_gain > 0 else math.nan
+        return 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+
+
+class ATR(Indicator):
+    fields = ("period", "count", "prev_close", "current")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.count = 0
+        self.prev_close = None
+        self.current = 0.0
+
+    def update(self, high: float, low: float, close: float) -> float:
+        high, low, close = float(high), float(low), float(close)
+        true_range = high - low
+        if self.prev_close is not None:
+            true_range = max(true_range, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.current = true_range if self.count == 0 else self.current + (true_range - self.current) / self.period
+        self.count += 1
+        self.prev_close = close
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.current if self.count >= self.period else math.nan
+
+
+INDICATORS = {cls.__name__: cls for cls in (RollingSum, RollingMean, RollingMax, RollingMin, EMA, RSI, ATR)}
+
+
+# ---------- STATE PERSISTENCE ----------
+def load_states(name: str, state_dir: str = DEFAULT_STATE_DIR) -> dict:
+    """
+    Saved per-symbol indicator states for one job/strategy ({} if none yet).
+    """
+    path = os.path.join(state_dir, f"{name}.json")
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable indicator state {path}: {e}")
+        return {}
+
+
+def save_states(name: str, states: dict, state_dir: str = DEFAULT_STATE_DIR):
+    os.makedirs(state_dir, exist_ok=True)
+    path = os.path.join(state_dir, f"{name}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(states, f)
+    os.replace(tmp_path, path)
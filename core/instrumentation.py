@@ -0,0 +1,146 @@
+# core/instrumentation.py
+
+from contextlib import contextmanager
+import threading
+import datetime
+import bisect
+import json
+import time
+import os
+
+# Per-run summaries are appended here as JSON lines
+METRICS_FILE = os.getenv("METRICS_FILE", "logs/metrics.jsonl")
+# METRICS=0 turns every timer/counter into a no-op
+METRICS_ENABLED = os.getenv("METRICS", "1") != "0"
+
+# Latency histogram bucket upper bounds, in milliseconds
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, float("inf"))
+
+_lock = threading.Lock()
+_timers = {}      # name -> [count, total_ms, max_ms]
+_counters = {}    # name -> number
+_histograms = {}  # name -> bucket counts
+_by_symbol = {}   # name -> {symbol: total_ms}
+
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+        _histograms.clear()
+        _by_symbol.clear()
+
+
+def increment(name: str, value=1):
+    if not METRICS_ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name: str, elapsed_ms: float, symbol: str = None):
+    """
+    Record one duration: timer totals, histogram bucket and (optionally) per-symbol total.
+    """
+    if not METRICS_ENABLED:
+        return
+    with _lock:
+        stats = _timers.setdefault(name, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed_ms
+        stats[2] = max(stats[2], elapsed_ms)
+
+        buckets = _histograms.setdefault(name, [0] * len(HISTOGRAM_BUCKETS_MS))
+        buckets[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, elapsed_ms)] += 1
+
+        if symbol is not None:
+            per_symbol = _by_symbol.setdefault(name, {})
+            per_symbol[symbol] = per_symbol.get(symbol, 0.0) + elapsed_ms
+
+
+@contextmanager
+def timer(name: str, symbol: str = None):
+    """
+    Time a block (or, as a decorator, every call): `with timer("broker.submit_order", symbol):`.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, (time.perf_counter() - started) * 1000, symbol)
+
+
+def _percentile(buckets: list, fraction: float, peak: float) -> float:
+    """
+    Upper bound of the bucket holding the given fraction of observations,
+    capped at the largest value actually seen.
+    """
+    target = fraction * sum(buckets)
+    running = 0
+    for bound, count in zip(HISTOGRAM_BUCKETS_MS, buckets):
+        running += count
+        if running >= target and count:
+            return round(min(bound, peak), 2)
+    return 0.0
+
+
+def snapshot(top_symbols: int = 10) -> dict:
+    """
+    Current timers (count/total/avg/max/p50/p95 in ms), counters, and the
+    slowest symbols per timer.
+    """
+    with _lock:
+        timers = {}
+        for name, (count, total, peak) in _timers.items():
+            buckets = _histograms.get(name, [])
+            timers[name] = {
+                "count": count,
+                "total_ms": round(total, 2),
+                "avg_ms": round(total / count, 2) if count else 0.0,
+                "max_ms": round(peak, 2),
+                "p50_ms": _percentile(buckets, 0.5, peak),
+                "p95_ms": _percentile(buckets, 0.95, peak),
+            }
+        slowest = {
+            name: dict(sorted(((s, round(ms, 2)) for s, ms in per_symbol.items()), key=lambda item: -item[1])[:top_symbols])
+            for name, per_symbol in _by_symbol.items()
+        }
+        return {"timers": timers, "counters": dict(_counters), "slowest_symbols": slowest}
+
+
+def write_summary(job: str, started_at: datetime.datetime, duration_s: float, path: str = METRICS_FILE) -> dict:
+    """
+    Append one JSON line describing a run and print a short stage breakdown.
+    """
+    summary = {
+        "job": job,
+        "started_at": started_at.strftime("%Y-%m-%d %H:%M:%S"),
+        "duration_s": round(duration_s, 3),
+        **snapshot(),
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(summary) + "\n")
+
+    stages = sorted(summary["timers"].items(), key=lambda item: -item[1]["total_ms"])[:5]
+    breakdown = ", ".join(f"{name} {stats['total_ms'] / 1000:.2f}s" for name, stats in stages)
+    print(f"📊 {job}: {duration_s:.2f}s total" + (f" | {breakdown}" if breakdown else ""))
+    return summary
+
+
+@contextmanager
+def run_context(job: str, path: str = None):
+    """
+    Scope metrics to one job run (usable as a decorator) and write its summary at the end.
+    """
+    reset()
+    started_at = datetime.datetime.utcnow()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if METRICS_ENABLED:
+            try:
+                write_summary(job, started_at, time.perf_counter() - started, path or METRICS_FILE)
+            except OSError as e:
+                print(f"⚠️ Could not write metrics summary: {e}")
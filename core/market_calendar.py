@@ -0,0 +1,47 @@
+# core/market_calendar.py
+
+import datetime
+import threading
+from zoneinfo import ZoneInfo
+
+# Exchange time zone used for every schedule and trading-day check
+MARKET_TIMEZONE = "America/New_York"
+MARKET_TZ = ZoneInfo(MARKET_TIMEZONE)
+
+# date -> bool, filled from the broker calendar once per day
+_trading_days = {}
+_calendar_lock = threading.Lock()
+
+
+def market_now() -> datetime.datetime:
+    return datetime.datetime.now(MARKET_TZ)
+
+
+def market_today() -> datetime.date:
+    return market_now().date()
+
+
+def is_trading_day(day: datetime.date = None, api=None) -> bool:
+    """
+    True when the exchange is open on `day` (default: today in New York).
+    Uses the broker's market calendar, so holidays count as closed. If the
+    calendar can't be reached, weekdays are assumed open and the answer is
+    not cached, so the next check asks again.
+    """
+    day = day or market_today()
+    with _calendar_lock:
+        if day in _trading_days:
+            return _trading_days[day]
+
+    try:
+        if api is None:
+            from core.broker import api
+        sessions = api.get_calendar(start=day.isoformat(), end=day.isoformat())
+        is_open = any(str(session.date)[:10] == day.isoformat() for session in sessions)
+    except Exception as e:
+        print(f"⚠️ Market calendar unavailable ({e}). Assuming weekdays are trading days.")
+        return day.weekday() < 5
+
+    with _calendar_lock:
+        _trading_days[day] = is_open
+    return is_open
@@ -1,18 +1,262 @@
-import requests
+# core/notifier.py
+
+import threading
+import atexit
+import queue
+import time
+import os
 from config.settings import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+from core import instrumentation as metrics
 
-def send_telegram(message):
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    payload = {
-        "chat_id": TELEGRAM_CHAT_ID,
-        "text": message
-    }
-
-    try:
-        response = requests.post(url, json=payload)
+# Alerts arriving within this many seconds of each other go out as one digest
+DIGEST_SECONDS = float(os.getenv("NOTIFY_DIGEST_SECONDS", "2"))
+# Most alerts folded into one digest
+DIGEST_MAX_ALERTS = int(os.getenv("NOTIFY_DIGEST_MAX", "50"))
+# Minimum gap between two sends to the same sink (Telegram allows ~1 msg/s per chat)
+MIN_SEND_INTERVAL = float(os.getenv("NOTIFY_MIN_INTERVAL", "1"))
+# Optional Slack/Discord-style webhook
+WEBHOOK_URL = os.getenv("NOTIFY_WEBHOOK_URL")
+
+HTTP_TIMEOUT = 10
+MAX_RETRIES = 3
+TELEGRAM_MAX_CHARS = 4096
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"rate limited, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Shared requests.Session with a keep-alive connection pool.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            _session = requests.Session()
+            _session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4))
+        return _session
+
+
+# ---------- SINKS ----------
+class TelegramSink:
+    name = "telegram"
+    max_chars = TELEGRAM_MAX_CHARS
+
+    def __init__(self, token: str = TELEGRAM_BOT_TOKEN, chat_id: str = TELEGRAM_CHAT_ID, session=None):
+        self.url = f"https://api.telegram.org/bot{token}/sendMessage"
+        self.chat_id = chat_id
+        self.session = session
+
+    def send(self, text: str):
+        session = self.session or get_session()
+        response = session.post(self.url, json={"chat_id": self.chat_id, "text": text}, timeout=HTTP_TIMEOUT)
+        if response.status_code == 429:
+            retry_after = response.json().get("parameters", {}).get("retry_after", 1)
+            raise RateLimited(float(retry_after))
         if response.status_code != 200:
-            print(f"❌ Telegram error: {response.status_code} - {response.text}")
+            raise RuntimeError(f"Telegram error: {response.status_code} - {response.text}")
+
+
+class WebhookSink:
+    """
+    POSTs {"<payload_key>": text} (Slack uses "text", Discord "content").
+    """
+
+    name = "webhook"
+    max_chars = 2000
+
+    def __init__(self, url: str, payload_key: str = "text", session=None):
+        self.url = url
+        self.payload_key = payload_key
+        self.session = session
+
+    def send(self, text: str):
+        session = self.session or get_session()
+        response = session.post(self.url, json={self.payload_key: text}, timeout=HTTP_TIMEOUT)
+        if response.status_code == 429:
+            raise RateLimited(float(response.headers.get("Retry-After", 1)))
+        if response.status_code >= 300:
+            raise RuntimeError(f"Webhook error: {response.status_code} - {response.text}")
+
+
+# ---------- DISPATCHER ----------
+def build_digest(messages: list, max_chars: int) -> list:
+    """
+    One text per burst of alerts (split to fit max_chars); a single alert is sent as is.
+    """
+    if len(messages) == 1:
+        lines = [messages[0]]
+    else:
+        lines = [f"📬 {len(messages)} alerts:"] + messages
+
+    texts, current = [], ""
+    for line in lines:
+        line = line[:max_chars]
+        if current and len(current) + 1 + len(line) > max_chars:
+            texts.append(current)
+            current = line
         else:
-            print(f"📣 Telegram message sent: {message}")
-    except Exception as e:
-        print(f"❌ Telegram exception: {e}")
+            current = f"{current}\n{line}" if current else line
+    if current:
+        texts.append(current)
+    return texts
+
+
+class Notifier:
+    """
+    Queues alerts and delivers them from a background thread, so callers
+    never wait on the network. Alerts that arrive within `digest_seconds`
+    of each other are coalesced into one digest per sink; sends to a sink
+    are spaced by `min_interval` and back off when the API says so.
+    """
+
+    def __init__(self, sinks: list, digest_seconds: float = DIGEST_SECONDS,
+                 max_alerts: int = DIGEST_MAX_ALERTS, min_interval: float = MIN_SEND_INTERVAL):
+        self.sinks = list(sinks)
+        self.digest_seconds = digest_seconds
+        self.max_alerts = max_alerts
+        self.min_interval = min_interval
+        self._queue = queue.Queue()
+        self._flush_now = threading.Event()
+        self._last_sent = {}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def notify(self, message: str):
+        metrics.increment("notify.alerts")
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="notifier", daemon=True)
+                self._thread.start()
+        self._queue.put(message)
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """
+        Send everything queued so far right away; True if it all went out in time.
+        """
+        self._flush_now.set()
+        deadline = time.monotonic() + timeout
+        try:
+            while self._queue.unfinished_tasks and time.monotonic() < deadline:
+                time.sleep(0.01)
+            return not self._queue.unfinished_tasks
+        finally:
+            self._flush_now.clear()
+
+    def _collect(self) -> list:
+        """
+        Block for the next alert, then keep taking alerts until the digest
+        window closes, the batch is full, or a flush is requested.
+        """
+        batch = [self._queue.get()]
+        window_end = time.monotonic() + self.digest_seconds
+        while len(batch) < self.max_alerts:
+            remaining = window_end - time.monotonic()
+            try:
+                if remaining <= 0 or self._flush_now.is_set():
+                    batch.append(self._queue.get_nowait())
+                else:
+                    # Short waits so a flush doesn't sit out the whole window
+                    batch.append(self._queue.get(timeout=min(remaining, 0.05)))
+            except queue.Empty:
+                if remaining <= 0 or self._flush_now.is_set():
+                    break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                for sink in self.sinks:
+                    for text in build_digest(batch, getattr(sink, "max_chars", TELEGRAM_MAX_CHARS)):
+                        self._deliver(sink, text)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _deliver(self, sink, text: str):
+        for attempt in range(MAX_RETRIES):
+            wait = self._last_sent.get(sink, 0) + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            name = getattr(sink, "name", "sink")
+            try:
+                with metrics.timer(f"notify.{name}.send"):
+                    sink.send(text)
+                metrics.increment("notify.messages_sent")
+                self._last_sent[sink] = time.monotonic()
+                print(f"📣 {getattr(sink, 'name', 'sink')} message sent: {text.splitlines()[0]}")
+                return
+            except RateLimited as e:
+                metrics.increment("notify.rate_limited")
+                print(f"⏳ {getattr(sink, 'name', 'sink')} rate limited, retrying in {e.retry_after}s")
+                self._last_sent[sink] = time.monotonic() + e.retry_after - self.min_interval
+            except Exception as e:
+                metrics.increment("notify.errors")
+                print(f"❌ {getattr(sink, 'name', 'sink')} exception: {e}")
+                return
+        print(f"❌ Gave up on {getattr(sink, 'name', 'sink')} message after {MAX_RETRIES} attempts")
+
+
+# ---------- DEFAULT INSTANCE ----------
+_notifier = None
+_notifier_lock = threading.Lock()
+
+
+def default_sinks() -> list:
+    sinks = []
+    if TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID:
+        sinks.append(TelegramSink())
+    if WEBHOOK_URL:
+        sinks.append(WebhookSink(WEBHOOK_URL))
+    if not sinks:
+        print("🔕 No notification sinks configured (TELEGRAM_BOT_TOKEN / NOTIFY_WEBHOOK_URL). Alerts will be dropped.")
+    return sinks
+
+
+def get_notifier() -> Notifier:
+    global _notifier
+    with _notifier_lock:
+        if _notifier is None:
+            _notifier = Notifier(default_sinks())
+        return _notifier
+
+
+def configure_notifier(sinks: list, **options) -> Notifier:
+    """
+    Replace the process-wide notifier (e.g. with core.fakes.StubSink for offline runs).
+    """
+    global _notifier
+    previous = _notifier
+    if previous is not None:
+        previous.flush()
+    with _notifier_lock:
+        _notifier = Notifier(sinks, **options)
+        return _notifier
+
+
+def send_telegram(message):
+    """
+    Queue an alert for every configured sink; returns immediately.
+    """
+    get_notifier().notify(message)
+
+
+def flush_notifications(timeout: float = 30.0) -> bool:
+    """
+    Deliver all queued alerts now (call at the end of a job).
+    """
+    if _notifier is None:
+        return True
+    return _notifier.flush(timeout)
+
+
+atexit.register(flush_notifications)
@@ -0,0 +1,169 @@
+# core/panel.py
+
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Canonical OHLCV field order stored in every panel
+FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+# Alpaca returns lower-case bar columns
+_FIELD_ALIASES = {field.lower(): field for field in FIELDS}
+
+
+def _naive_dates(index) -> pd.DatetimeIndex:
+    dates = pd.DatetimeIndex(index)
+    if dates.tz is not None:
+        dates = dates.tz_convert(None).normalize()
+    return dates
+
+
+def _normalize_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Flat OHLCV columns and a naive DatetimeIndex, whatever shape the provider
+    (or the cache) handed back.
+    """
+    if isinstance(frame.index, pd.MultiIndex):
+        frame = frame.set_axis(frame.index.get_level_values(-1), axis=0)
+    if isinstance(frame.columns, pd.MultiIndex):
+        frame = frame.set_axis(frame.columns.get_level_values(0), axis=1)
+    frame = frame.rename(columns=lambda col: _FIELD_ALIASES.get(str(col).strip(), str(col).strip()))
+    return frame.set_axis(_naive_dates(frame.index), axis=0)
+
+
+class Panel:
+    """
+    Packed OHLCV data for many symbols on one shared calendar.
+
+    values has shape (symbol, date, field), so each symbol's history is one
+    contiguous (date × field) block and frame(symbol) is a zero-copy view.
+    Dates a symbol didn't trade are NaN. Cross-sections such as
+    field("Volume") are strided (date × symbol) views over the same buffer.
+    """
+
+    def __init__(self, values: np.ndarray, dates: pd.DatetimeIndex, symbols: list, fields=FIELDS):
+        self.values = values
+        self.dates = pd.DatetimeIndex(dates)
+        self.symbols = list(symbols)
+        self.fields = tuple(fields)
+        self._symbol_pos = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._field_pos = {field: i for i, field in enumerate(self.fields)}
+
+    # ---------- Constructors ----------
+    @classmethod
+    def from_frames(cls, frames: dict, dtype=np.float32) -> "Panel":
+        """
+        Build from a dict of per-symbol OHLCV frames (e.g. the OHLCV cache).
+        """
+        frames = {symbol: _normalize_frame(frame) for symbol, frame in frames.items() if frame is not None and not frame.empty}
+        if not frames:
+            return cls(np.empty((0, 0, len(FIELDS)), dtype=dtype), pd.DatetimeIndex([]), [])
+
+        dates = pd.DatetimeIndex(sorted(set().union(*(frame.index for frame in frames.values()))))
+        values = np.full((len(frames), len(dates), len(FIELDS)), np.nan, dtype=dtype)
+        for i, frame in enumerate(frames.values()):
+            frame = frame[~frame.index.duplicated(keep="last")]
+            rows = dates.get_indexer(frame.index)
+            for k, field in enumerate(FIELDS):
+                if field in frame.columns:
+                    values[i, rows, k] = frame[field].to_numpy(dtype=dtype)
+        return cls(values, dates, list(frames))
+
+    @classmethod
+    def from_wide(cls, combined: pd.DataFrame, dtype=np.float32) -> "Panel":
+        """
+        Build from a multi-ticker frame with (field, symbol) columns, as returned
+        by yf.download(group_by="column"), without splitting it per symbol.
+        """
+        if combined is None or combined.empty:
+            return cls(np.empty((0, 0, len(FIELDS)), dtype=dtype), pd.DatetimeIndex([]), [])
+
+        combined = combined.rename(columns=lambda col: _FIELD_ALIASES.get(col, col), level=0)
+        symbols = list(dict.fromkeys(combined.columns.get_level_values(-1)))
+        columns = pd.MultiIndex.from_product([FIELDS, symbols])
+        wide = combined.reindex(columns=columns).dropna(how="all")
+
+        dates = _naive_dates(wide.index)
+        packed = wide.to_numpy(dtype=dtype).reshape(len(dates), len(FIELDS), len(symbols))
+        values = np.ascontiguousarray(packed.transpose(2, 0, 1))
+
+        # Symbols the request returned nothing for
+        has_data = ~np.isnan(values).all(axis=(1, 2))
+        return cls(values[has_data], dates, [s for s, keep in zip(symbols, has_data) if keep])
+
+    @classmethod
+    def from_long(cls, bars: pd.DataFrame, dtype=np.float32) -> "Panel":
+        """
+        Build from a long bar table indexed by (symbol, timestamp), as returned
+        by Alpaca's get_stock_bars().df.
+        """
+        if bars is None or bars.empty:
+            return cls(np.empty((0, 0, len(FIELDS)), dtype=dtype), pd.DatetimeIndex([]), [])
+        fields = [col for col in bars.columns if col in _FIELD_ALIASES]
+        return cls.from_wide(bars[fields].unstack(level=0), dtype=dtype)
+
+    # ---------- Persistence ----------
+    def save(self, directory: str):
+        """
+        Write values, dates and labels as .npy/.json files that load() can memory-map.
+        """
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "values.npy"), np.ascontiguousarray(self.values))
+        np.save(os.path.join(directory, "dates.npy"), self.dates.to_numpy())
+        with open(os.path.join(directory, "labels.json"), "w") as f:
+            json.dump({"symbols": self.symbols, "fields": list(self.fields)}, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode="r") -> "Panel":
+        """
+        Open a saved panel. With mmap_mode="r" the values stay on disk and are
+        paged in on access, so several processes share one copy through the
+        page cache instead of each holding (or unpickling) their own.
+        """
+        values = np.load(os.path.join(directory, "values.npy"), mmap_mode=mmap_mode)
+        dates = pd.DatetimeIndex(np.load(os.path.join(directory, "dates.npy")))
+        with open(os.path.join(directory, "labels.json")) as f:
+            labels = json.load(f)
+        return cls(values, dates, labels["symbols"], labels["fields"])
+
+    # ---------- Access ----------
+    def __contains__(self, symbol) -> bool:
+        return symbol in self._symbol_pos
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+    def frame(self, symbol: str) -> pd.DataFrame:
+        """
+        Zero-copy (date × field) view of one symbol, including NaN rows for
+        dates it didn't trade.
+        """
+        block = self.values[self._symbol_pos[symbol]]
+        return pd.DataFrame(block, index=self.dates, columns=list(self.fields), copy=False)
+
+    def history(self, symbol: str, field: str) -> np.ndarray:
+        """
+        One symbol's values for one field over the shared calendar (NaN where absent).
+        """
+        return self.values[self._symbol_pos[symbol], :, self._field_pos[field]]
+
+    def field(self, name: str) -> np.ndarray:
+        """
+        (date × symbol) view of one field across all symbols.
+        """
+        return self.values[:, :, self._field_pos[name]].T
+
+    def to_frames(self, dropna: bool = True) -> dict:
+        """
+        Per-symbol frames for code that still expects dict[str, DataFrame].
+        """
+        frames = {}
+        for symbol in self.symbols:
+            frame = self.frame(symbol)
+            frames[symbol] = frame.dropna() if dropna else frame
+        return frames
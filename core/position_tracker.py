@@ -1,27 +1,27 @@
 # core/position_tracker.py
 
-import sqlite3
+from core.sqlite_logger import DB_FILE, get_connection, db_lock, flush_trades
+from core.sqlite_logger import rebuild_positions as _rebuild_positions
+import argparse
 
-def get_open_positions_by_strategy(strategy_name: str, db_path="logs/trades.db") -> list:
+def get_open_positions_by_strategy(strategy_name: str, db_path=DB_FILE, env="paper") -> list:
     """
     Returns open positions for a given strategy.
-    An open position is any BUY trade that doesn't have a matching SELL or is not marked as closed.
+    Reads the positions table, which aggregates every buy/sell fill into one row
+    per symbol (total qty, average cost) as trades are logged.
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    # Get all buys that have not been closed by a corresponding sell or marked closed
-    cursor.execute("""
-        SELECT symbol, qty, price, timestamp
-        FROM trades
-        WHERE action = 'buy'
-        AND strategy = ?
-        AND env = 'paper'
-        AND status != 'closed'
-    """, (strategy_name,))
-
-    rows = cursor.fetchall()
-    conn.close()
+    # Make sure trades queued by this process are visible
+    flush_trades()
+
+    with db_lock():
+        conn = get_connection(db_path)
+        rows = conn.execute("""
+            SELECT symbol, qty, avg_cost, opened_at
+            FROM positions
+            WHERE strategy = ?
+            AND env = ?
+            AND qty > 0
+        """, (strategy_name, env)).fetchall()
 
     holdings = []
     for row in rows:
@@ -33,3 +33,43 @@ def get_open_positions_by_strategy(strategy_name: str, db_path="logs/trades.db")
         })
 
     return holdings
+
+def get_position(strategy_name: str, symbol: str, db_path=DB_FILE, env="paper") -> dict | None:
+    """
+    Current holding of one symbol for a strategy (primary-key lookup), or None.
+    """
+    flush_trades()
+
+    with db_lock():
+        conn = get_connection(db_path)
+        row = conn.execute("""
+            SELECT qty, avg_cost, opened_at
+            FROM positions
+            WHERE strategy = ? AND env = ? AND symbol = ?
+        """, (strategy_name, env, symbol)).fetchone()
+
+    if row is None:
+        return None
+    return {"symbol": symbol, "qty": row[0], "price": row[1], "timestamp": row[2]}
+
+def rebuild_positions(db_path=DB_FILE):
+    """
+    Rebuild the positions table from the full trade history.
+    """
+    flush_trades()
+
+    with db_lock():
+        conn = get_connection(db_path)
+        _rebuild_positions(conn)
+        count = conn.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    print(f"🔁 Rebuilt positions from trade history: {count} open positions")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rebuild", action="store_true", help="Recompute positions from the trade log")
+    parser.add_argument("--db", default=DB_FILE, help="Path to the trades database")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        rebuild_positions(args.db)
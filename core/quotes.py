@@ -0,0 +1,82 @@
+# core/quotes.py
+
+from typing import List, Literal
+import os
+
+# Define valid quote source types
+QuoteSourceType = Literal["alpaca", "yfinance"]
+
+# Get default quote source from environment variable or fallback to the broker snapshot
+DEFAULT_QUOTE_SOURCE = os.getenv("QUOTE_SOURCE", "alpaca")
+
+# ---------- ALPACA IMPLEMENTATION ----------
+def get_quotes_alpaca(symbols: List[str]) -> dict:
+    """
+    Latest prices from the broker's multi-symbol snapshot (cached briefly in-process).
+    """
+    from core.broker import get_latest_prices
+    return get_latest_prices(symbols)
+
+# ---------- YFINANCE IMPLEMENTATION ----------
+def get_quotes_yfinance(symbols: List[str]) -> dict:
+    """
+    Last 1-minute close for all symbols from a single multi-ticker request.
+    """
+    import yfinance as yf
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return {}
+
+    bars = yf.download(
+        symbols, period="1d", interval="1m", auto_adjust=False,
+        group_by="column", progress=False
+    )
+    if bars is None or bars.empty:
+        return {}
+    _cache_minute_bars(bars, symbols)
+
+    closes = bars["Close"]
+    result = {}
+    for symbol in symbols:
+        if symbol not in closes.columns:
+            continue
+        series = closes[symbol].dropna()
+        if not series.empty:
+            result[symbol] = float(series.iloc[-1])
+    return result
+
+def _cache_minute_bars(bars, symbols: List[str]):
+    """
+    Keep the session's minute bars in the intraday cache (see stream_intraday_bars)
+    instead of dropping them after reading the last close.
+    """
+    from core.data_provider import DEFAULT_USE_CACHE, _split_yfinance_frame
+    if not DEFAULT_USE_CACHE:
+        return
+    from core.data_cache import MinuteBarCache, split_sessions
+    from core.market_calendar import MARKET_TIMEZONE
+
+    cache = MinuteBarCache("yfinance", timezone=MARKET_TIMEZONE)
+    try:
+        for symbol, frame in _split_yfinance_frame(bars, symbols).items():
+            for day, session in split_sessions(frame.droplevel(-1, axis=1), MARKET_TIMEZONE).items():
+                cache.store(symbol, day, session)
+    except OSError as e:
+        print(f"⚠️ Could not cache minute bars: {e}")
+
+# Provider lookup used by the unified interface
+QUOTE_PROVIDERS = {
+    "alpaca": get_quotes_alpaca,
+    "yfinance": get_quotes_yfinance,
+}
+
+# ---------- PUBLIC INTERFACE FUNCTION ----------
+def get_quotes(symbols: List[str], source: QuoteSourceType = DEFAULT_QUOTE_SOURCE) -> dict:
+    """
+    Unified interface for current prices of many symbols in one round trip.
+    Symbols without a price are left out of the result.
+    """
+    quote_fn = QUOTE_PROVIDERS.get(source)
+    if quote_fn is None:
+        raise ValueError(f"Unknown quote source: {source}")
+    return quote_fn(symbols)
@@ -1,37 +1,257 @@
 import sqlite3
+import threading
+import atexit
+import queue
+import time
 from datetime import datetime
 import os
+from core import instrumentation as metrics
 
 DB_FILE = "logs/trades.db"
 os.makedirs("logs", exist_ok=True)
 
-def init_db():
-    with sqlite3.connect(DB_FILE) as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS trades (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT,
-                symbol TEXT,
-                action TEXT,
-                qty INTEGER,
-                price REAL,
-                strategy TEXT,
-                env TEXT,
-                status TEXT,
-                notes TEXT
-            )
+# Max rows written per transaction by the background writer
+WRITE_BATCH_SIZE = 500
+
+# Retries for a batch that hits a transient error (e.g. "database is locked"
+# while another job holds the write lock), with linear backoff in seconds
+WRITE_RETRIES = int(os.getenv("TRADE_WRITE_RETRIES", "3"))
+WRITE_RETRY_DELAY = float(os.getenv("TRADE_WRITE_RETRY_DELAY", "0.5"))
+
+# One long-lived connection per (process, db path), shared across threads
+_connections = {}
+_db_lock = threading.RLock()
+
+# Write-behind queue drained by a single writer thread
+_write_queue = queue.Queue()
+_writer = None
+
+# Rows that could not be written yet; retried on every flush_trades()
+_unwritten = []
+
+
+def _create_schema(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS trades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT,
+            symbol TEXT,
+            action TEXT,
+            qty INTEGER,
+            price REAL,
+            strategy TEXT,
+            env TEXT,
+            status TEXT,
+            notes TEXT
+        )
+    """)
+    # Open-position lookups match strategy/env/action exactly and filter on status
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_trades_strategy_env_action_status
+        ON trades (strategy, env, action, status)
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_symbol ON trades (symbol)")
+
+    # Current holdings per (strategy, env, symbol), maintained with every fill
+    has_positions = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'positions'"
+    ).fetchone()
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS positions (
+            strategy TEXT,
+            env TEXT,
+            symbol TEXT,
+            qty INTEGER,
+            avg_cost REAL,
+            opened_at TEXT,
+            updated_at TEXT,
+            PRIMARY KEY (strategy, env, symbol)
+        )
+    """)
+    conn.commit()
+
+    # Existing trade logs get their positions table built once
+    if not has_positions:
+        rebuild_positions(conn)
+
+
+def _apply_fill(conn, timestamp, symbol, action, qty, price, strategy, env, status):
+    """
+    Fold one fill into the positions table (average-cost accounting).
+    Buys marked closed are ignored, matching the trade-log definition of open.
+    """
+    if action == "buy" and status != "closed":
+        conn.execute("""
+            INSERT INTO positions (strategy, env, symbol, qty, avg_cost, opened_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (strategy, env, symbol) DO UPDATE SET
+                qty = qty + excluded.qty,
+                avg_cost = (avg_cost * qty + excluded.avg_cost * excluded.qty) / (qty + excluded.qty),
+                updated_at = excluded.updated_at
+        """, (strategy, env, symbol, qty, price, timestamp, timestamp))
+    elif action == "sell":
+        conn.execute("""
+            UPDATE positions SET qty = qty - ?, updated_at = ?
+            WHERE strategy = ? AND env = ? AND symbol = ?
+        """, (qty, timestamp, strategy, env, symbol))
+        conn.execute("""
+            DELETE FROM positions
+            WHERE strategy = ? AND env = ? AND symbol = ? AND qty <= 0
+        """, (strategy, env, symbol))
+
+
+def rebuild_positions(conn):
+    """
+    Recompute the positions table by replaying the whole trade log in order.
+    """
+    with conn:
+        conn.execute("DELETE FROM positions")
+        cursor = conn.execute("""
+            SELECT timestamp, symbol, action, qty, price, strategy, env, status
+            FROM trades
+            ORDER BY id
         """)
-        conn.commit()
+        for row in cursor:
+            _apply_fill(conn, *row)
+
+
+def get_connection(db_path=DB_FILE):
+    """
+    Process-wide SQLite connection in WAL mode, created (with schema) on first use.
+    Callers must hold db_lock() while using it.
+    """
+    key = (os.getpid(), db_path)
+    with _db_lock:
+        conn = _connections.get(key)
+        if conn is None:
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            _create_schema(conn)
+            _connections[key] = conn
+        return conn
+
+
+def db_lock():
+    return _db_lock
+
+
+def init_db():
+    get_connection()
+
+
+def _write_batch(rows):
+    """
+    Insert a batch of trade rows and update positions in a single transaction.
+    """
+    with _db_lock, metrics.timer("db.write_batch"):
+        conn = get_connection()
+        with conn:
+            conn.executemany("""
+                INSERT INTO trades (timestamp, symbol, action, qty, price, strategy, env, status, notes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            for row in rows:
+                _apply_fill(conn, *row[:8])
+    metrics.increment("db.rows_written", len(rows))
+
+
+def _write_rows(rows) -> list:
+    """
+    Write rows as one batch, retrying transient SQLite errors. If the batch
+    still fails, write the rows one by one so a single bad row can't take
+    the others down. Returns the rows that could not be written.
+    """
+    for attempt in range(WRITE_RETRIES + 1):
+        try:
+            _write_batch(rows)
+            return []
+        except sqlite3.OperationalError as e:
+            if attempt == WRITE_RETRIES:
+                print(f"⚠️ Writing {len(rows)} trades failed after {attempt + 1} attempts: {e}")
+                break
+            time.sleep(WRITE_RETRY_DELAY * (attempt + 1))
+        except Exception as e:
+            print(f"⚠️ Writing {len(rows)} trades failed: {e}")
+            break
+
+    if len(rows) == 1:
+        return list(rows)
+    failed = []
+    for row in rows:
+        try:
+            _write_batch([row])
+        except Exception as e:
+            metrics.increment("db.rows_failed")
+            print(f"❌ Failed to write trade {row[2].upper()} {row[1]} x{row[3]} @ ${row[4]} [{row[5]}]: {e}")
+            failed.append(row)
+    return failed
+
+
+def _writer_loop():
+    while True:
+        batch = [_write_queue.get()]
+        while len(batch) < WRITE_BATCH_SIZE:
+            try:
+                batch.append(_write_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        try:
+            failed = _write_rows(batch)
+            if failed:
+                with _db_lock:
+                    _unwritten.extend(failed)
+        finally:
+            for _ in batch:
+                _write_queue.task_done()
+
+
+def _ensure_writer():
+    global _writer
+    with _db_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_writer_loop, name="trade-writer", daemon=True)
+            _writer.start()
+
+
+def flush_trades() -> bool:
+    """
+    Block until every queued trade has been written. Rows that failed
+    earlier are retried; returns False if any still could not be written
+    (they are kept for the next flush).
+    """
+    _write_queue.join()
+    with _db_lock:
+        if not _unwritten:
+            return True
+        pending = _unwritten[:]
+        _unwritten.clear()
+    failed = _write_rows(pending)
+    with _db_lock:
+        _unwritten[:0] = failed
+        if not _unwritten:
+            return True
+        print(f"❌ {len(_unwritten)} trades are not in the trade log yet")
+        return False
+
+
+def _flush_at_exit():
+    if not flush_trades():
+        # Last chance: leave the rows in the job output so they can be re-entered
+        for row in _unwritten:
+            print(f"❌ Unwritten trade: {row}")
+
+
+atexit.register(_flush_at_exit)
+
 
 def log_trade(symbol, action, qty, price, strategy="volume_breakout", env="paper", status="executed", notes=None):
+    """
+    Queue a trade row for the background writer; never blocks on SQLite.
+    """
     timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    with sqlite3.connect(DB_FILE) as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO trades (timestamp, symbol, action, qty, price, strategy, env, status, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (timestamp, symbol, action, qty, price, strategy, env, status, notes))
-        conn.commit()
+    _ensure_writer()
+    _write_queue.put((timestamp, symbol, action, qty, price, strategy, env, status, notes))
 
     print(f"📝 Logged trade: {action.upper()} {symbol} x{qty} @ ${price} [{strategy} | {env}]")
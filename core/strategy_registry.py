@@ -1,5 +1,31 @@
-from strategies.high_volume_breakout import run, run_backtest_on_day, run_exit
+import importlib
+
+
+class _LazyFunction:
+    """
+    Registry entry that imports its strategy module on first call, so looking
+    at the registry doesn't pull in pandas, data providers or broker clients.
+    Exposes __module__ like the function it stands for.
+    """
+
+    def __init__(self, module: str, name: str):
+        self.__module__ = module
+        self.__name__ = name
+        self._fn = None
+
+    def __call__(self, *args, **kwargs):
+        if self._fn is None:
+            self._fn = getattr(importlib.import_module(self.__module__), self.__name__)
+        return self._fn(*args, **kwargs)
+
 
 STRATEGY_REGISTRY = {
-    "volume_breakout": run
-}
\ No newline at end of file
+    "volume_breakout": _LazyFunction("strategies.high_volume_breakout", "run")
+}
+
+# Market data each strategy needs, as a function of its config:
+# {"lookback_days": int, "interval": "1d", "source": "yfinance"}
+# Buy jobs fetch the union once and hand the shared panel to every run(config, panel)
+STRATEGY_REQUIREMENTS = {
+    "volume_breakout": _LazyFunction("strategies.high_volume_breakout", "data_requirements")
+}
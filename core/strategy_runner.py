@@ -0,0 +1,117 @@
+# core/strategy_runner.py
+
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import os
+from core import instrumentation as metrics
+
+# Upper bound on strategies evaluated at once
+MAX_STRATEGY_WORKERS = int(os.getenv("MAX_STRATEGY_WORKERS", "4"))
+
+# Intervals the shared fetch can serve
+SUPPORTED_INTERVALS = ("1d",)
+
+
+def history_start(lookback_days: int) -> str:
+    """
+    First calendar date to fetch so `lookback_days` trading bars are covered.
+    """
+    return (datetime.date.today() - datetime.timedelta(days=lookback_days * 2 + 10)).isoformat()
+
+
+def plan_data_requests(configs: dict, requirements: dict) -> dict:
+    """
+    Union of every strategy's data needs, grouped by (interval, source).
+    Returns {(interval, source): {"tickers", "lookback_days", "strategies"}}.
+    """
+    plan = {}
+    for name, config in configs.items():
+        requirement_fn = requirements.get(name)
+        if requirement_fn is None:
+            continue
+        needs = requirement_fn(config)
+        interval = needs.get("interval", "1d")
+        if interval not in SUPPORTED_INTERVALS:
+            raise ValueError(f"Strategy {name} needs unsupported interval: {interval}")
+
+        key = (interval, needs.get("source", "yfinance"))
+        request = plan.setdefault(key, {"tickers": {}, "lookback_days": 0, "strategies": []})
+        request["tickers"].update(dict.fromkeys(config.get("tickers", [])))
+        request["lookback_days"] = max(request["lookback_days"], needs.get("lookback_days", 0))
+        request["strategies"].append(name)
+
+    for request in plan.values():
+        request["tickers"] = list(request["tickers"])
+    return plan
+
+
+def fetch_shared_data(plan: dict, fetch_fn=None) -> dict:
+    """
+    One panel per (interval, source) group, keyed by strategy name.
+    """
+    if fetch_fn is None:
+        from core.data_provider import get_daily_panel as fetch_fn
+
+    panels = {}
+    for (interval, source), request in plan.items():
+        print(f"📦 Fetching {len(request['tickers'])} tickers once for {', '.join(request['strategies'])}")
+        panel = fetch_fn(request["tickers"], start=history_start(request["lookback_days"]), end=None, source=source)
+        for name in request["strategies"]:
+            panels[name] = panel
+    return panels
+
+
+def shared_quote_provider(symbols, source=None, quote_fn=None):
+    """
+    Quote every symbol in one bulk request and return a callable that serves
+    any subset of them, for run_exit(config={"quote_provider": ...}).
+    """
+    if quote_fn is None:
+        from core.quotes import get_quotes, DEFAULT_QUOTE_SOURCE
+        quote_fn = lambda requested: get_quotes(requested, source=source or DEFAULT_QUOTE_SOURCE)
+
+    prices = quote_fn(list(dict.fromkeys(symbols))) if symbols else {}
+    return lambda requested: {symbol: prices[symbol] for symbol in requested if symbol in prices}
+
+
+def evaluate_strategies(tasks: dict, max_workers: int = MAX_STRATEGY_WORKERS) -> tuple:
+    """
+    Call every strategy concurrently. `tasks` maps name -> (fn, args).
+    Returns ({name: signals}, {name: exception}) so one failing strategy
+    doesn't stop the others.
+    """
+    results, errors = {}, {}
+    if not tasks:
+        return results, errors
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks)))) as pool:
+        futures = {name: pool.submit(metrics.timer(f"strategy.{name}")(fn), *args) for name, (fn, args) in tasks.items()}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result() or []
+            except Exception as e:
+                errors[name] = e
+    return results, errors
+
+
+def consolidate_signals(signals_by_strategy: dict) -> list:
+    """
+    Merge signals for the same symbol and action into one order.
+    The order's qty is the sum across strategies, and "allocations" keeps
+    each strategy's share so fills are logged (and later exited) per strategy.
+    "strategies" lists the tags in registry order.
+    """
+    merged = {}
+    for name, signals in signals_by_strategy.items():
+        for signal in signals:
+            key = (signal["symbol"], signal.get("action"))
+            qty = signal.get("qty", 1)
+            order = merged.get(key)
+            if order is None:
+                merged[key] = {**signal, "qty": qty, "strategies": [name], "allocations": {name: qty}}
+                continue
+            order["qty"] += qty
+            order["allocations"][name] = order["allocations"].get(name, 0) + qty
+            if name not in order["strategies"]:
+                order["strategies"].append(name)
+    return list(merged.values())
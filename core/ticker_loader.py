@@ -1,9 +1,160 @@
-import pandas as pd
+# core/ticker_loader.py
+
+import threading
+import pickle
+import csv
+import os
+
+TICKERS_CSV = "data/tickers.csv"
+UNIVERSE_CACHE_DIR = os.getenv("TICKER_CACHE_DIR", "cache/tickers")
+
+# Bump when the pickled layout changes
+_CACHE_VERSION = 1
+
+# (csv path, mtime, size) -> TickerUniverse, shared by every caller in the process
+_universes = {}
+_universe_lock = threading.Lock()
+
+
+class TickerUniverse:
+    """
+    The ticker list as parallel tuples (symbol, name, sector, industry, index
+    memberships) plus inverted indexes from each index/sector/industry to row
+    positions, so selecting a subset is a set lookup instead of a CSV scan.
+    Selections come back in the CSV's order.
+    """
+
+    def __init__(self, rows: list):
+        self.symbols = tuple(row["symbol"] for row in rows)
+        self.names = tuple(row.get("name") or "" for row in rows)
+        self.sectors = tuple(row.get("sector") or "Unknown" for row in rows)
+        self.industries = tuple(row.get("industry") or "Unknown" for row in rows)
+        self.memberships = tuple(tuple(filter(None, (row.get("index") or "").split("|"))) for row in rows)
+
+        self._position = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.by_index = _invert(self.memberships)
+        self.by_sector = _invert((sector,) for sector in self.sectors)
+        self.by_industry = _invert((industry,) for industry in self.industries)
+
+    @classmethod
+    def from_csv(cls, path: str = TICKERS_CSV) -> "TickerUniverse":
+        with open(path, newline="") as f:
+            return cls(list(csv.DictReader(f)))
+
+    # ---------- Access ----------
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol) -> bool:
+        return symbol in self._position
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    def info(self, symbol: str) -> dict:
+        i = self._position[symbol]
+        return {
+            "symbol": symbol,
+            "name": self.names[i],
+            "sector": self.sectors[i],
+            "industry": self.industries[i],
+            "index": list(self.memberships[i]),
+        }
+
+    def sector_map(self) -> dict:
+        return dict(zip(self.symbols, self.sectors))
+
+    def select(self, index=None, sector=None, industry=None) -> list:
+        """
+        Symbols matching every given filter. Each filter is one value or a
+        list of values (any of which may match); None means no filter.
+        """
+        positions = None
+        for lookup, wanted in ((self.by_index, index), (self.by_sector, sector), (self.by_industry, industry)):
+            if wanted is None:
+                continue
+            values = [wanted] if isinstance(wanted, str) else wanted
+            matched = set().union(*(lookup.get(value, ()) for value in values))
+            positions = matched if positions is None else positions & matched
+
+        if positions is None:
+            return list(self.symbols)
+        return [self.symbols[i] for i in sorted(positions)]
+
+
+def _invert(groups) -> dict:
+    index = {}
+    for i, keys in enumerate(groups):
+        for key in keys:
+            index.setdefault(key, []).append(i)
+    return {key: tuple(rows) for key, rows in index.items()}
+
+
+def get_universe(path: str = TICKERS_CSV, cache_dir: str = UNIVERSE_CACHE_DIR) -> TickerUniverse:
+    """
+    The ticker universe for `path`, built once per process and pickled under
+    cache_dir. Both copies are keyed by the CSV's mtime and size, so editing
+    the CSV rebuilds them.
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _universe_lock:
+        universe = _universes.get(key)
+        if universe is not None:
+            return universe
+
+        cache_file = os.path.join(cache_dir, f"{os.path.splitext(os.path.basename(path))[0]}.pkl")
+        universe = _load_cached_universe(cache_file, key)
+        if universe is None:
+            universe = TickerUniverse.from_csv(path)
+            _store_cached_universe(cache_file, key, universe)
+
+        _universes[key] = universe
+        return universe
+
+
+def _load_cached_universe(cache_file: str, key: tuple):
+    try:
+        with open(cache_file, "rb") as f:
+            version, cached_key, universe = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError):
+        return None
+    if version != _CACHE_VERSION or cached_key != key:
+        return None
+    return universe
+
+
+def _store_cached_universe(cache_file: str, key: tuple, universe: TickerUniverse):
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp_file = f"{cache_file}.tmp"
+        with open(tmp_file, "wb") as f:
+            pickle.dump((_CACHE_VERSION, key, universe), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"⚠️ Could not cache ticker universe: {e}")
+
 
 def load_tickers(index_filter=None):
-    df = pd.read_csv("data/tickers.csv")
-    
-    if index_filter:
-        df = df[df["index"].str.contains(index_filter)]
-    
-    return df["symbol"].tolist()
+    return get_universe().select(index=index_filter or None)
+
+
+def load_ticker_sectors():
+    """
+    Map of symbol -> GICS sector from the ticker list.
+    """
+    return get_universe().sector_map()
+
+
+def select_tickers(config: dict) -> list:
+    """
+    Tickers for a job or backtest config: an explicit "tickers" list, or the
+    universe filtered by optional "index", "sector" and "industry" keys.
+    """
+    if "tickers" in config:
+        return list(config["tickers"])
+    return get_universe().select(
+        index=config.get("index"),
+        sector=config.get("sector"),
+        industry=config.get("industry")
+    )
@@ -1,10 +1,17 @@
 # jobs/backtester.py
 
 from core.strategy_registry import STRATEGY_REGISTRY
-from core.data_provider import get_daily_data
-from core.ticker_loader import load_tickers
+from core.data_provider import get_daily_panel
+from core.ticker_loader import select_tickers, load_ticker_sectors
+from core.analytics import EquityCurve, DEFAULT_INITIAL_CAPITAL, DEFAULT_POSITION_SIZE
+from core.instrumentation import run_context, timer
+from core.panel import Panel
+import multiprocessing
+import numpy as np
 import pandas as pd
+import tempfile
 import datetime
+import math
 import csv
 import os
 import argparse
@@ -46,117 +53,436 @@ def simulate_exit(entry_price, data, profit_pct, loss_pct):
         print(f"⚠️ Final row error: {e}")
         return (None, entry_price, "hold")
 
-def run_backtest(config):
-    strategy_name = config["strategy"]
-    tickers = tickers = config.get("tickers", load_tickers())
-    start_date = config["start_date"]
-    end_date = config["end_date"]
+EXIT_HORIZON = 14
+
+def simulate_exits(entry_positions, entry_prices, high, low, close, profit_pct, loss_pct, horizon=EXIT_HORIZON):
+    """
+    Array version of simulate_exit() for many entries at once.
+    For each entry at row i, scans rows i+1 .. i+horizon of the High/Low/Close
+    arrays and returns, per entry, (exit_pos, exit_price, outcome) arrays where
+    exit_pos is -1 when there is no bar after the entry.
+    The first bar whose High reaches the target or whose Low reaches the stop
+    wins, with the target checked first on the same bar, exactly like the loop.
+    """
+    entry_positions = np.asarray(entry_positions, dtype=np.int64)
+    entry_prices = np.asarray(entry_prices, dtype=float)
+    n = len(close)
+
+    target_prices = entry_prices * (1 + profit_pct)
+    stop_prices = entry_prices * (1 - loss_pct)
+
+    # (entries × horizon) matrix of forward row positions, clipped at the last bar
+    rows = entry_positions[:, None] + 1 + np.arange(horizon)
+    in_range = rows < n
+    rows = np.minimum(rows, n - 1)
+
+    hit_target = (high[rows] >= target_prices[:, None]) & in_range
+    hit_stop = (low[rows] <= stop_prices[:, None]) & in_range
+    hit = hit_target | hit_stop
+
+    first = hit.argmax(axis=1)
+    any_hit = hit.any(axis=1)
+    first_is_target = hit_target[np.arange(len(first)), first]
+
+    # No hit: exit at the close of the last bar inside the horizon
+    last_pos = np.minimum(entry_positions + horizon, n - 1)
+    exit_pos = np.where(any_hit, entry_positions + 1 + first, last_pos)
+    exit_prices = np.where(
+        any_hit,
+        np.where(first_is_target, target_prices, stop_prices),
+        close[last_pos]
+    )
+    outcomes = np.where(any_hit, np.where(first_is_target, "win", "loss"), "hold")
+
+    # Entry on the final bar has no future data to exit into
+    no_future = entry_positions + 1 >= n
+    exit_pos[no_future] = -1
+    exit_prices[no_future] = entry_prices[no_future]
+
+    return exit_pos, exit_prices, outcomes
+
+def find_entry_positions(data, symbol, config, strategy_module):
+    """
+    Row positions where the strategy fires a buy.
+    Uses the strategy's vectorized generate_signals() hook when it has one,
+    otherwise falls back to calling run_backtest_on_day() on every window.
+    """
+    lookback = config["lookback_days"]
+    last = len(data) - 1
+
+    signal_fn = getattr(strategy_module, "generate_signals", None)
+    if signal_fn is not None:
+        signals = signal_fn(data, config).to_numpy(dtype=bool)
+        positions = np.flatnonzero(signals)
+        return positions[(positions >= lookback) & (positions < last)].tolist()
 
-    max_tickers = config.get("max_tickers")
-    if max_tickers:
-        tickers = tickers[:max_tickers]
+    backtest_fn = getattr(strategy_module, "run_backtest_on_day")
+    positions = []
+    for i in range(lookback, last):
+        window = data.iloc[i - lookback:i + 1]
+        if backtest_fn(window, symbol, config):
+            positions.append(i)
+    return positions
+
+def backtest_symbol(symbol, data, config, strategy_module, curve=None):
+    """
+    Simulate every entry for one symbol and return its trade rows.
+    """
+    entry_positions = find_entry_positions(data, symbol, config, strategy_module)
+    return simulate_trades(symbol, data, entry_positions, config, curve)
+
+def simulate_trades(symbol, data, entry_positions, config, curve=None):
+    """
+    Resolve exits for already-known entry rows and build the trade rows.
+    When an EquityCurve is given, the trades are also folded into it.
+    """
+    if not entry_positions:
+        return []
+
+    high = data["High"].to_numpy(dtype=float)
+    low = data["Low"].to_numpy(dtype=float)
+    close = data["Close"].to_numpy(dtype=float)
+    entry_prices = close[entry_positions]
+
+    exit_positions, exit_prices, outcomes = simulate_exits(
+        entry_positions,
+        entry_prices,
+        high,
+        low,
+        close,
+        config['profit_pct'],
+        config['loss_pct']
+    )
+    if curve is not None:
+        curve.add_symbol(symbol, data.index, close, entry_positions, exit_positions, exit_prices, outcomes)
 
+    results = []
+    for i, entry_price, exit_pos, exit_price, outcome in zip(
+        entry_positions, entry_prices, exit_positions, exit_prices, outcomes
+    ):
+        entry_date = data.index[i]
+        exit_date = data.index[exit_pos] if exit_pos >= 0 else None
+
+        holding_days = (exit_date - entry_date).days if exit_date else 0
+        gain_pct = ((exit_price - entry_price) / entry_price) * 100
+
+        results.append({
+            "date": entry_date.strftime("%Y-%m-%d"),
+            "symbol": symbol,
+            "entry_price": round(entry_price, 2),
+            "exit_price": round(exit_price, 2),
+            "gain_pct": round(gain_pct, 2),
+            "holding_days": holding_days,
+            "outcome": str(outcome)
+        })
+
+    return results
+
+def load_strategy_module(strategy_name):
+    """
+    Resolve the module behind a registered strategy and make sure it can be backtested.
+    """
     strategy = STRATEGY_REGISTRY.get(strategy_name)
     strategy_module = __import__(strategy.__module__, fromlist=["run_backtest_on_day"])
 
     if not hasattr(strategy_module, "run_backtest_on_day"):
         raise Exception("Selected strategy does not support backtesting.")
 
-    backtest_fn = getattr(strategy_module, "run_backtest_on_day")
-    results = []
-
-    # Fetch all data up front for all tickers using unified interface
-    data_map = get_daily_data(tickers, start=start_date, end=end_date, source=config.get("data_source", "yfinance"))
-
+    return strategy_module
+
+def load_symbol_panel(tickers, config):
+    """
+    Fetch all tickers as one panel.
+    Defaults to float64 so prices and volumes keep full precision.
+    """
+    return get_daily_panel(
+        tickers,
+        start=config["start_date"],
+        end=config["end_date"],
+        source=config.get("data_source", "yfinance"),
+        dtype=config.get("panel_dtype", "float64")
+    )
+
+def symbol_frame(panel, symbol):
+    """
+    One symbol's backtest frame (flat OHLCV columns, incomplete rows dropped),
+    or None when it has no complete bars.
+    """
+    if symbol not in panel:
+        return None
+    data = panel.frame(symbol).dropna()
+    return data if not data.empty else None
+
+def load_symbol_data(tickers, config):
+    """
+    Per-symbol backtest frames for all tickers, keyed by symbol.
+    """
+    panel = load_symbol_panel(tickers, config)
+
+    frames = {}
     for symbol in tickers:
-        print(f"🔍 Backtesting {symbol}...")
-        data = data_map.get(symbol)
+        data = symbol_frame(panel, symbol)
+        if data is not None:
+            frames[symbol] = data
+    return frames
+
+def resolve_tickers(config):
+    """
+    Ticker list for a backtest config, honoring "tickers" (or the "index",
+    "sector" and "industry" universe filters) and "max_tickers".
+    """
+    tickers = select_tickers(config)
 
-        if data is None or data.empty:
-            print(f"❌ No data found for {symbol}. Skipping.")
+    max_tickers = config.get("max_tickers")
+    if max_tickers:
+        tickers = tickers[:max_tickers]
+    return tickers
+
+class BacktestResultsWriter:
+    """
+    Streams trade rows to the results CSV as each symbol finishes and keeps
+    the summary statistics as running aggregates, so memory stays flat no
+    matter how many trades a run produces. The file is written under a
+    temporary name and only replaces the previous results on close(); a
+    failed run calls discard() and leaves them untouched.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._tmp_path = f"{path}.tmp"
+        self._file = None
+        self._writer = None
+        self.total = 0
+        self.wins = 0
+        self.gain_sum = 0.0
+        self.worst_gain = None
+
+    def write(self, rows):
+        if not rows:
+            return
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self._tmp_path, "w", newline="")
+            self._writer = csv.DictWriter(self._file, fieldnames=list(rows[0].keys()))
+            self._writer.writeheader()
+        self._writer.writerows(rows)
+
+        for row in rows:
+            gain = float(row["gain_pct"])
+            self.total += 1
+            self.wins += row["outcome"] == "win"
+            self.gain_sum += gain
+            self.worst_gain = gain if self.worst_gain is None else min(self.worst_gain, gain)
+
+    def close(self):
+        if self._file is None:
+            return
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+        self._file = None
+
+    def discard(self):
+        if self._file is None:
+            return
+        self._file.close()
+        os.remove(self._tmp_path)
+        self._file = None
+
+    def summary(self) -> dict:
+        total = self.total
+        return {
+            "total": total,
+            "win_rate": self.wins / total * 100 if total > 0 else 0,
+            "avg_gain": self.gain_sum / total if total > 0 else 0,
+            "worst_gain": self.worst_gain if total > 0 else 0,
+        }
+
+def panel_calendar(panel, symbols) -> pd.DatetimeIndex:
+    """
+    Dates on which any of `symbols` has a complete bar; the same calendar
+    build_calendar() gives for their frames, without building them.
+    """
+    position = {symbol: i for i, symbol in enumerate(panel.symbols)}
+    rows = [position[symbol] for symbol in symbols if symbol in position]
+    if not rows:
+        return pd.DatetimeIndex([])
+    complete = np.zeros(len(panel.dates), dtype=bool)
+    for row in rows:
+        complete |= ~np.isnan(panel.values[row]).any(axis=1)
+    return panel.dates[complete].sort_values()
+
+def build_equity_curve(calendar, config) -> EquityCurve:
+    """
+    Empty equity curve over the backtest calendar, sized from the config.
+    """
+    return EquityCurve(
+        calendar,
+        initial_capital=config.get("initial_capital", DEFAULT_INITIAL_CAPITAL),
+        position_size=config.get("position_size", DEFAULT_POSITION_SIZE),
+        sectors=load_ticker_sectors()
+    )
+
+def write_analytics(curve, strategy_name):
+    """
+    Save the daily equity curve and the per-symbol breakdown next to the trades CSV.
+    """
+    curve_file = os.path.join("backtest_results", f"{strategy_name}_equity.csv")
+    pd.concat([curve.equity(), curve.invested()], axis=1).to_csv(curve_file, index_label="date")
+
+    symbols_file = os.path.join("backtest_results", f"{strategy_name}_by_symbol.csv")
+    curve.by_symbol().to_csv(symbols_file, index=False)
+
+class CurveRecorder:
+    """
+    Stands in for the EquityCurve inside a worker process: keeps the
+    add_symbol() calls so the parent can replay them into the real curve.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def add_symbol(self, *args):
+        self.calls.append(args)
+
+# Per-process state of a backtest worker
+_WORKER = {}
+
+# Shards per worker: small enough to balance uneven symbols, large enough to amortize IPC
+SHARDS_PER_WORKER = 4
+
+def _init_backtest_worker(panel_dir, strategy_name):
+    _WORKER["panel"] = Panel.load(panel_dir, mmap_mode="r")
+    _WORKER["strategy_module"] = load_strategy_module(strategy_name)
+
+def _backtest_shard(task):
+    """
+    Backtest a contiguous run of tickers; returns (symbol, rows, curve calls)
+    per ticker, with rows None when the symbol has no data.
+    """
+    symbols, config = task
+    results = []
+    for symbol in symbols:
+        data = symbol_frame(_WORKER["panel"], symbol)
+        if data is None:
+            results.append((symbol, None, []))
             continue
+        recorder = CurveRecorder()
+        rows = backtest_symbol(symbol, data, config, _WORKER["strategy_module"], recorder)
+        results.append((symbol, rows, recorder.calls))
+    return results
+
+def _pool_context():
+    # fork lets workers start without re-importing pandas or pickling the parent's data
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+def backtest_in_parallel(panel, tickers, config, strategy_name, workers):
+    """
+    Yield (symbol, rows, curve calls) in ticker order, computed by `workers`
+    processes over contiguous shards of the ticker list. The panel reaches
+    the workers as memory-mapped .npy files rather than pickled frames.
+    """
+    shard_size = max(1, math.ceil(len(tickers) / (workers * SHARDS_PER_WORKER)))
+    tasks = [(tickers[i:i + shard_size], config) for i in range(0, len(tickers), shard_size)]
+
+    with tempfile.TemporaryDirectory(prefix="backtest-panel-") as panel_dir:
+        panel.save(panel_dir)
+        ctx = _pool_context()
+        with ctx.Pool(processes=min(workers, len(tasks)), initializer=_init_backtest_worker, initargs=(panel_dir, strategy_name)) as pool:
+            # imap hands shards back in submission order, so the merge is deterministic
+            for shard in pool.imap(_backtest_shard, tasks):
+                yield from shard
+
+def backtest_serially(panel, tickers, config, strategy_module, curve):
+    """
+    Yield (symbol, rows, curve calls) in ticker order from this process,
+    folding trades straight into `curve`.
+    """
+    for symbol in tickers:
+        data = symbol_frame(panel, symbol)
+        if data is None:
+            yield symbol, None, []
+            continue
+        with timer("backtest.symbol", symbol):
+            rows = backtest_symbol(symbol, data, config, strategy_module, curve)
+        yield symbol, rows, []
+
+@run_context("backtest")
+def run_backtest(config, workers=None):
+    """
+    Backtest every ticker and write the trades CSV and analytics.
+    With workers > 1 the tickers are sharded across processes; results are
+    merged in ticker order, so the output is identical to a serial run.
+    """
+    strategy_name = config["strategy"]
+    tickers = resolve_tickers(config)
+    workers = workers or config.get("workers") or 1
 
-        data = data.dropna()
-
-        # Step 3: Flatten MultiIndex columns like ('High', 'AAPL') → 'High'
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.get_level_values(0)
+    strategy_module = load_strategy_module(strategy_name)
+    results_file = os.path.join("backtest_results", f"{strategy_name}.csv")
+    writer = BacktestResultsWriter(results_file)
 
-        # Normalize column names
-        data.columns = [str(col).strip() for col in data.columns]
+    # Fetch all data up front for all tickers using unified interface
+    with timer("backtest.load_data"):
+        panel = load_symbol_panel(tickers, config)
+        curve = build_equity_curve(panel_calendar(panel, tickers), config)
 
-        # Ensure required OHLC columns
-        required_cols = {"High", "Low", "Close"}
-        if not required_cols.issubset(data.columns):
-            print(f"❌ Missing expected OHLC columns in {symbol}. Skipping.")
-            continue
+    if workers > 1 and len(tickers) > 1:
+        print(f"🧵 Backtesting {len(tickers)} symbols with {workers} workers...")
+        results = backtest_in_parallel(panel, tickers, config, strategy_name, workers)
+    else:
+        results = backtest_serially(panel, tickers, config, strategy_module, curve)
 
-        for i in range(config["lookback_days"], len(data) - 1):
-            window = data.iloc[i - config["lookback_days"]:i + 1]
-            result = backtest_fn(window, symbol, config)
-
-            if result:
-                entry_date = window.index[-1]
-                entry_price = window.iloc[-1]['Close']
-                future_data = data.iloc[i+1:i+15]
-
-                exit_date, exit_price, outcome = simulate_exit(
-                    entry_price,
-                    future_data,
-                    config['profit_pct'],
-                    config['loss_pct']
-                )
-
-                holding_days = (exit_date - entry_date).days if exit_date else 0
-                gain_pct = ((exit_price - entry_price) / entry_price) * 100
-
-                results.append({
-                    "date": entry_date.strftime("%Y-%m-%d"),
-                    "symbol": symbol,
-                    "entry_price": round(entry_price, 2),
-                    "exit_price": round(exit_price, 2),
-                    "gain_pct": round(gain_pct, 2),
-                    "holding_days": holding_days,
-                    "outcome": outcome
-                })
-
-    if not results:
+    try:
+        with timer("backtest.simulate"):
+            for symbol, rows, curve_calls in results:
+                print(f"🔍 Backtesting {symbol}...")
+                if rows is None:
+                    print(f"❌ No data found for {symbol}. Skipping.")
+                    continue
+
+                for call in curve_calls:
+                    curve.add_symbol(*call)
+                # 💾 Flush each symbol's trades to disk as soon as it finishes
+                writer.write(rows)
+    except BaseException:
+        # ❌ Keep the previous results rather than a partial run
+        writer.discard()
+        raise
+    writer.close()
+
+    if writer.total == 0:
         print("⚠️ No valid backtest results to write.")
         return
 
-    os.makedirs("backtest_results", exist_ok=True)
-    results_file = os.path.join("backtest_results", f"{strategy_name}.csv")
-    with open(results_file, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
-        writer.writeheader()
-        writer.writerows(results)
-
     print("\n📈 Backtest Results Summary:")
-    df = pd.DataFrame(results)
+    summary = writer.summary()
 
-    if df.empty:
-        print("No trades were triggered in the backtest.")
-        return
+    print(f"Total trades: {summary['total']}")
+    print(f"Win rate: {summary['win_rate']:.2f}%")
+    print(f"Avg return: {summary['avg_gain']:.2f}%")
+    print(f"Worst trade: {summary['worst_gain']:.2f}%")
 
-    df["gain_pct"] = pd.to_numeric(df["gain_pct"], errors="coerce")
-    df = df.dropna(subset=["gain_pct"])
+    # 📊 Portfolio view: every trade sized at position_size out of initial_capital
+    metrics = curve.metrics()
+    print(f"Final equity: ${metrics['final_equity']:,.2f} ({metrics['total_return']:.2f}%, CAGR {metrics['cagr']:.2f}%)")
+    print(f"Max drawdown: {metrics['max_drawdown']:.2f}%")
+    print(f"Sharpe: {metrics['sharpe']:.2f} | Sortino: {metrics['sortino']:.2f}")
+    print(f"Exposure: {metrics['exposure']:.2f}% | Turnover: {metrics['turnover']:.2f}x/yr")
 
-    total = len(df)
-    wins = df[df["outcome"] == "win"]
-    losses = df[df["outcome"] == "loss"]
-    win_rate = len(wins) / total * 100 if total > 0 else 0
-    avg_gain = df["gain_pct"].mean() if total > 0 else 0
-    max_drawdown = df["gain_pct"].min() if total > 0 else 0
+    print("\n🏷️ By sector:")
+    for row in curve.by_sector().itertuples(index=False):
+        print(f"{row.sector}: {row.trades} trades, win rate {row.win_rate:.2f}%, P&L ${row.pnl:,.2f}")
 
-    print(f"Total trades: {total}")
-    print(f"Win rate: {win_rate:.2f}%")
-    print(f"Avg return: {avg_gain:.2f}%")
-    print(f"Max drawdown: {max_drawdown:.2f}%")
+    with timer("backtest.analytics"):
+        write_analytics(curve, strategy_name)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--config", required=True, help="Path to config JSON file")
+    parser.add_argument("--workers", type=int, help="Worker processes to shard symbols across (default: config \"workers\" or 1)")
     args = parser.parse_args()
 
     config = load_config(args.config)
-    run_backtest(config)
+    run_backtest(config, workers=args.workers)
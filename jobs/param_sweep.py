@@ -0,0 +1,166 @@
+# jobs/param_sweep.py
+
+from jobs.backtester import load_config, load_strategy_module, load_symbol_data, resolve_tickers, find_entry_positions, simulate_trades, _pool_context
+from core.analytics import EquityCurve, build_calendar, DEFAULT_INITIAL_CAPITAL, DEFAULT_POSITION_SIZE
+import itertools
+import argparse
+import time
+import csv
+import os
+
+# Parameters a sweep can vary, split by what they affect
+SIGNAL_PARAMS = ["volume_multiplier", "lookback_days"]
+EXIT_PARAMS = ["profit_pct", "loss_pct"]
+
+# Columns of the consolidated results table: per-trade stats, then portfolio equity stats
+GAIN_COLUMNS = ["trades", "win_rate", "avg_return", "total_return", "worst_trade"]
+EQUITY_COLUMNS = ["sharpe", "sortino", "max_drawdown", "exposure"]
+METRIC_COLUMNS = GAIN_COLUMNS + EQUITY_COLUMNS
+
+# Market data shared with worker processes (inherited copy-on-write under fork)
+_SHARED = {}
+
+
+def expand_grid(grid: dict, base_config: dict) -> list:
+    """
+    Every parameter combination as a list of dicts, with unspecified
+    parameters taken from the base config.
+    """
+    names = SIGNAL_PARAMS + EXIT_PARAMS
+    values = [grid.get(name, [base_config[name]]) for name in names]
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def summarize_trades(trades: list) -> dict:
+    """
+    Metrics used to rank one parameter set.
+    """
+    gains = [trade["gain_pct"] for trade in trades]
+    wins = sum(1 for trade in trades if trade["outcome"] == "win")
+    return summarize_gains(gains, wins)
+
+
+def summarize_gains(gains, wins: int) -> dict:
+    """
+    Ranking metrics from per-trade gain_pct values and the number of winners.
+    """
+    total = len(gains)
+    if total == 0:
+        return {"trades": 0, "win_rate": 0.0, "avg_return": 0.0, "total_return": 0.0, "worst_trade": 0.0}
+
+    return {
+        "trades": total,
+        "win_rate": round(wins / total * 100, 2),
+        "avg_return": round(float(sum(gains)) / total, 4),
+        "total_return": round(float(sum(gains)), 2),
+        "worst_trade": float(min(gains)),
+    }
+
+
+def summarize_curve(curve: EquityCurve) -> dict:
+    """
+    Portfolio equity metrics used to rank one parameter set.
+    """
+    metrics = curve.metrics()
+    return {name: round(metrics[name], 4) for name in EQUITY_COLUMNS}
+
+
+def _init_worker(frames, strategy_name):
+    _SHARED["frames"] = frames
+    _SHARED["calendar"] = build_calendar(frames)
+    _SHARED["strategy_module"] = load_strategy_module(strategy_name)
+
+
+def _run_signal_group(task):
+    """
+    Evaluate every exit parameter set for one signal parameter set.
+    Entry signals depend only on the signal params, so they are computed once
+    per symbol and reused across all profit/loss combinations.
+    """
+    base_config, signal_params, exit_param_sets = task
+    frames = _SHARED["frames"]
+    strategy_module = _SHARED["strategy_module"]
+
+    signal_config = {**base_config, **signal_params}
+    entries = {
+        symbol: find_entry_positions(data, symbol, signal_config, strategy_module)
+        for symbol, data in frames.items()
+    }
+
+    rows = []
+    for exit_params in exit_param_sets:
+        config = {**signal_config, **exit_params}
+        curve = EquityCurve(
+            _SHARED["calendar"],
+            initial_capital=config.get("initial_capital", DEFAULT_INITIAL_CAPITAL),
+            position_size=config.get("position_size", DEFAULT_POSITION_SIZE)
+        )
+        trades = []
+        for symbol, data in frames.items():
+            trades.extend(simulate_trades(symbol, data, entries[symbol], config, curve))
+        rows.append({**signal_params, **exit_params, **summarize_trades(trades), **summarize_curve(curve)})
+    return rows
+
+
+def run_sweep(config, workers=None):
+    """
+    Grid-search the strategy parameters in config["grid"] over one shared data load.
+    Writes backtest_results/sweep_<strategy>.csv ranked by config["rank_by"].
+    """
+    strategy_name = config["strategy"]
+    tickers = resolve_tickers(config)
+    rank_by = config.get("rank_by", "avg_return")
+    if rank_by not in METRIC_COLUMNS:
+        raise ValueError(f"Unknown rank_by metric: {rank_by}")
+    workers = workers or config.get("workers") or os.cpu_count()
+
+    # Make sure the strategy is backtestable before fetching anything
+    load_strategy_module(strategy_name)
+
+    combos = expand_grid(config.get("grid", {}), config)
+    groups = {}
+    for combo in combos:
+        signal_params = tuple((name, combo[name]) for name in SIGNAL_PARAMS)
+        groups.setdefault(signal_params, []).append({name: combo[name] for name in EXIT_PARAMS})
+
+    # One data load serves every combination
+    frames = load_symbol_data(tickers, config)
+    if not frames:
+        print("⚠️ No market data loaded. Nothing to sweep.")
+        return
+
+    print(f"🧪 Sweeping {len(combos)} combinations over {len(frames)} symbols with {workers} workers...")
+    started = time.perf_counter()
+
+    tasks = [(config, dict(signal_params), exit_sets) for signal_params, exit_sets in groups.items()]
+    ctx = _pool_context()
+    with ctx.Pool(processes=min(workers, len(tasks)), initializer=_init_worker, initargs=(frames, strategy_name)) as pool:
+        rows = [row for group_rows in pool.imap(_run_signal_group, tasks) for row in group_rows]
+
+    rows.sort(key=lambda row: row[rank_by], reverse=True)
+
+    os.makedirs("backtest_results", exist_ok=True)
+    results_file = os.path.join("backtest_results", f"sweep_{strategy_name}.csv")
+    with open(results_file, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SIGNAL_PARAMS + EXIT_PARAMS + METRIC_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    elapsed = time.perf_counter() - started
+    print(f"\n🏁 Sweep finished in {elapsed:.1f}s → {results_file}")
+    print(f"Top 5 by {rank_by}:")
+    for row in rows[:5]:
+        params = ", ".join(f"{name}={row[name]}" for name in SIGNAL_PARAMS + EXIT_PARAMS)
+        print(f"  {params} | trades={row['trades']} win_rate={row['win_rate']:.2f}% avg_return={row['avg_return']:.2f}% sharpe={row['sharpe']:.2f} max_dd={row['max_drawdown']:.2f}%")
+
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", required=True, help="Path to sweep config JSON file")
+    parser.add_argument("--workers", type=int, help="Number of worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    run_sweep(config, workers=args.workers)
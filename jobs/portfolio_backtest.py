@@ -0,0 +1,243 @@
+# jobs/portfolio_backtest.py
+
+from jobs.backtester import load_config, load_strategy_module, load_symbol_data, resolve_tickers, find_entry_positions, simulate_exits
+from core.analytics import build_calendar, equity_metrics, DEFAULT_INITIAL_CAPITAL, DEFAULT_POSITION_SIZE
+import numpy as np
+import pandas as pd
+import argparse
+import heapq
+import time
+import csv
+import os
+
+# Default portfolio constraints and cost model
+DEFAULT_PORTFOLIO = {
+    "max_positions": 20,
+    "slippage_bps": 5.0,
+    "commission_per_share": 0.005,
+    "commission_min": 1.0,
+}
+
+TRADE_COLUMNS = ["date", "symbol", "exit_date", "shares", "entry_price", "exit_price", "pnl", "gain_pct", "outcome"]
+
+
+def commission(shares, per_share: float, minimum: float):
+    """
+    Per-order commission: a per-share rate with a minimum ticket, zero for no shares.
+    """
+    shares = np.asarray(shares, dtype=float)
+    return np.where(shares > 0, np.maximum(shares * per_share, minimum), 0.0)
+
+
+def build_signal_matrices(frames: dict, calendar: pd.DatetimeIndex, config: dict, strategy_module) -> dict:
+    """
+    (date × symbol) arrays on the shared calendar: closes, dollar volume, entry
+    flags, and for every entry the calendar row and price it exits at.
+    Exits come from the same simulate_exits() the per-symbol engine uses.
+    """
+    shape = (len(calendar), len(frames))
+    close = np.full(shape, np.nan)
+    dollar_volume = np.zeros(shape)
+    entries = np.zeros(shape, dtype=bool)
+    exit_row = np.full(shape, -1, dtype=np.int64)
+    exit_price = np.full(shape, np.nan)
+    outcome = np.full(shape, "", dtype=object)
+
+    for j, (symbol, data) in enumerate(frames.items()):
+        rows = calendar.get_indexer(data.index)
+        symbol_close = data["Close"].to_numpy(dtype=float)
+        close[rows, j] = symbol_close
+        dollar_volume[rows, j] = symbol_close * data["Volume"].to_numpy(dtype=float)
+
+        positions = np.asarray(find_entry_positions(data, symbol, config, strategy_module), dtype=np.int64)
+        if len(positions) == 0:
+            continue
+        exit_pos, prices, outcomes = simulate_exits(
+            positions,
+            symbol_close[positions],
+            data["High"].to_numpy(dtype=float),
+            data["Low"].to_numpy(dtype=float),
+            symbol_close,
+            config["profit_pct"],
+            config["loss_pct"]
+        )
+        valid = exit_pos >= 0
+        entry_rows = rows[positions[valid]]
+        entries[entry_rows, j] = True
+        exit_row[entry_rows, j] = rows[exit_pos[valid]]
+        exit_price[entry_rows, j] = prices[valid]
+        outcome[entry_rows, j] = outcomes[valid]
+
+    return {
+        "close": close,
+        "marks": pd.DataFrame(close).ffill().to_numpy(),
+        "dollar_volume": dollar_volume,
+        "entries": entries,
+        "exit_row": exit_row,
+        "exit_price": exit_price,
+        "outcome": outcome,
+    }
+
+
+def simulate_portfolio(matrices: dict, calendar: pd.DatetimeIndex, symbols: list, config: dict) -> dict:
+    """
+    Day-by-day simulation of one cash account over the shared calendar.
+
+    Each day, positions due to exit are popped from a heap keyed by exit row
+    and sold first, freeing cash and slots. That day's signals are then ranked
+    by dollar volume as one cross-section, and bought in order while slots and
+    buying power last. Fills pay slippage on both sides plus commission, and
+    open positions are marked to the latest close.
+    """
+    settings = {**DEFAULT_PORTFOLIO, **config.get("portfolio", {})}
+    initial_capital = float(config.get("initial_capital", DEFAULT_INITIAL_CAPITAL))
+    position_size = float(config.get("position_size", DEFAULT_POSITION_SIZE))
+    max_positions = int(settings["max_positions"])
+    slippage = settings["slippage_bps"] / 10_000
+    fees = (settings["commission_per_share"], settings["commission_min"])
+
+    close, marks = matrices["close"], matrices["marks"]
+    n_days, n_symbols = close.shape
+
+    cash = initial_capital
+    shares_held = np.zeros(n_symbols)
+    held = np.zeros(n_symbols, dtype=bool)
+    pending = []
+    open_trades = {}
+    trades = []
+    equity = np.empty(n_days)
+    invested = np.empty(n_days)
+    traded_notional = 0.0
+    skipped = 0
+
+    for t in range(n_days):
+        # 🚪 Exits due today, earliest-scheduled first
+        while pending and pending[0][0] <= t:
+            _, _, j = heapq.heappop(pending)
+            trade = open_trades.pop(j)
+            fill = trade["target_exit"] * (1 - slippage)
+            proceeds = trade["shares"] * fill - float(commission(trade["shares"], *fees))
+            cash += proceeds
+            traded_notional += trade["shares"] * fill
+            held[j] = False
+            shares_held[j] = 0.0
+            trades.append(_close_trade(trade, calendar[t], fill, proceeds, trade["outcome"]))
+
+        # ✅ Today's signals as one cross-section
+        candidates = np.flatnonzero(matrices["entries"][t] & ~held)
+        if len(candidates):
+            slots = max_positions - int(held.sum())
+            ranked = candidates[np.argsort(-matrices["dollar_volume"][t, candidates], kind="stable")]
+            chosen = ranked[:max(slots, 0)]
+
+            fills = close[t, chosen] * (1 + slippage)
+            qty = np.floor(position_size / fills)
+            cost = qty * fills + commission(qty, *fees)
+            affordable = (qty > 0) & (np.cumsum(cost) <= cash)
+            skipped += len(candidates) - int(affordable.sum())
+
+            for j, shares, fill, total in zip(chosen[affordable], qty[affordable], fills[affordable], cost[affordable]):
+                open_trades[j] = {
+                    "date": calendar[t],
+                    "symbol": symbols[j],
+                    "shares": shares,
+                    "entry_price": fill,
+                    "cost": total,
+                    "target_exit": matrices["exit_price"][t, j],
+                    "outcome": matrices["outcome"][t, j],
+                }
+                heapq.heappush(pending, (matrices["exit_row"][t, j], t, j))
+            cash -= cost[affordable].sum()
+            traded_notional += float((qty[affordable] * fills[affordable]).sum())
+            held[chosen[affordable]] = True
+            shares_held[chosen[affordable]] = qty[affordable]
+
+        invested[t] = shares_held[held] @ marks[t, held]
+        equity[t] = cash + invested[t]
+
+    # Positions still open at the end are reported at their last mark
+    for j, trade in open_trades.items():
+        value = trade["shares"] * marks[-1, j]
+        trades.append(_close_trade(trade, None, marks[-1, j], value, "open"))
+
+    return {
+        "trades": trades,
+        "equity": pd.Series(equity, index=calendar, name="equity"),
+        "invested": pd.Series(invested, index=calendar, name="invested"),
+        "traded_notional": traded_notional,
+        "initial_capital": initial_capital,
+        "skipped": skipped,
+    }
+
+
+def _close_trade(trade, exit_date, exit_price, proceeds, outcome) -> dict:
+    pnl = proceeds - trade["cost"]
+    return {
+        "date": trade["date"].strftime("%Y-%m-%d"),
+        "symbol": trade["symbol"],
+        "exit_date": exit_date.strftime("%Y-%m-%d") if exit_date is not None else "",
+        "shares": int(trade["shares"]),
+        "entry_price": round(float(trade["entry_price"]), 4),
+        "exit_price": round(float(exit_price), 4),
+        "pnl": round(float(pnl), 2),
+        "gain_pct": round(float(pnl / trade["cost"] * 100), 2),
+        "outcome": str(outcome),
+    }
+
+
+def run_portfolio_backtest(config):
+    """
+    Backtest the strategy as one capital-constrained portfolio across all tickers.
+    Writes backtest_results/portfolio_<strategy>.csv and the daily equity curve.
+    """
+    strategy_name = config["strategy"]
+    tickers = resolve_tickers(config)
+    strategy_module = load_strategy_module(strategy_name)
+
+    frames = load_symbol_data(tickers, config)
+    if not frames:
+        print("⚠️ No market data loaded. Nothing to simulate.")
+        return
+
+    calendar = build_calendar(frames)
+    print(f"💼 Portfolio backtest over {len(frames)} symbols and {len(calendar)} days...")
+    started = time.perf_counter()
+
+    matrices = build_signal_matrices(frames, calendar, config, strategy_module)
+    result = simulate_portfolio(matrices, calendar, list(frames), config)
+    trades = result["trades"]
+
+    os.makedirs("backtest_results", exist_ok=True)
+    results_file = os.path.join("backtest_results", f"portfolio_{strategy_name}.csv")
+    with open(results_file, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=TRADE_COLUMNS)
+        writer.writeheader()
+        writer.writerows(trades)
+
+    curve_file = os.path.join("backtest_results", f"portfolio_{strategy_name}_equity.csv")
+    pd.concat([result["equity"], result["invested"]], axis=1).to_csv(curve_file, index_label="date")
+
+    elapsed = time.perf_counter() - started
+    metrics = equity_metrics(result["equity"], result["initial_capital"], result["invested"], result["traded_notional"])
+    closed = [trade for trade in trades if trade["outcome"] != "open"]
+    winners = sum(1 for trade in closed if trade["pnl"] > 0)
+
+    print(f"\n🏁 Portfolio backtest finished in {elapsed:.1f}s → {results_file}")
+    print("📈 Portfolio Results Summary:")
+    print(f"Trades: {len(closed)} closed, {len(trades) - len(closed)} open, {result['skipped']} signals skipped")
+    print(f"Win rate: {winners / len(closed) * 100 if closed else 0:.2f}%")
+    print(f"Final equity: ${metrics['final_equity']:,.2f} ({metrics['total_return']:.2f}%, CAGR {metrics['cagr']:.2f}%)")
+    print(f"Max drawdown: {metrics['max_drawdown']:.2f}%")
+    print(f"Sharpe: {metrics['sharpe']:.2f} | Sortino: {metrics['sortino']:.2f}")
+    print(f"Exposure: {metrics['exposure']:.2f}% | Turnover: {metrics['turnover']:.2f}x/yr")
+
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", required=True, help="Path to config JSON file")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    run_portfolio_backtest(config)
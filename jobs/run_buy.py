@@ -1,66 +1,94 @@
 # jobs/run_buy.py
 
-from core.strategy_registry import STRATEGY_REGISTRY
-from core.broker import buy_stock, get_current_price
-from core.notifier import send_telegram
-from core.sqlite_logger import init_db, log_trade
-from core.ticker_loader import load_tickers
+from core.strategy_registry import STRATEGY_REGISTRY, STRATEGY_REQUIREMENTS
+from core.strategy_runner import plan_data_requests, fetch_shared_data, evaluate_strategies, consolidate_signals
+from core.execution import execute_signals
+from core.notifier import send_telegram, flush_notifications
+from core.sqlite_logger import init_db, flush_trades
+from core.ticker_loader import select_tickers
+from core.instrumentation import run_context, timer
 
 # ✅ Default configuration per strategy
 # These can be overridden via CLI args or scheduler-based configuration
+# Configs without "tickers" scan the universe (optionally filtered by "index",
+# "sector" or "industry"), resolved when the job runs
 DEFAULT_CONFIGS = {
     "volume_breakout": {
-        "tickers": load_tickers(),
         "volume_multiplier": 0.5,
         "lookback_days": 5,
         "period": "6d"
     }
 }
 
+def get_config(strategy_name: str) -> dict:
+    """
+    Default config for a strategy with its ticker list filled in.
+    """
+    config = dict(DEFAULT_CONFIGS.get(strategy_name, {}))
+    config["tickers"] = select_tickers(config)
+    return config
+
+@run_context("buy")
 def run_all_strategies():
     """
     Executes all registered BUY strategies:
     - Initializes local DB
-    - Runs strategy and gets buy signals
-    - Places orders, logs trades, and sends notifications
+    - Fetches the union of every strategy's market data once
+    - Runs all strategies in parallel on the shared data
+    - Merges signals per symbol (tagged with each strategy), places orders,
+      logs trades, and sends notifications
+    - Appends the run's stage timings and counters to logs/metrics.jsonl
     """
     init_db()
+    configs = {name: get_config(name) for name in STRATEGY_REGISTRY}
 
+    # 📦 One download serves every strategy; a failed fetch lets each strategy fetch its own
+    try:
+        with timer("buy.fetch"):
+            panels = fetch_shared_data(plan_data_requests(configs, STRATEGY_REQUIREMENTS))
+    except Exception as e:
+        print(f"⚠️ Shared data fetch failed, strategies will fetch their own: {e}")
+        panels = {}
+
+    tasks = {}
     for strategy_name, strategy_fn in STRATEGY_REGISTRY.items():
-        config = DEFAULT_CONFIGS.get(strategy_name, {})
         print(f"▶️ Running strategy: {strategy_name}")
+        panel = panels.get(strategy_name)
+        args = (configs[strategy_name], panel) if panel is not None else (configs[strategy_name],)
+        tasks[strategy_name] = (strategy_fn, args)
 
-        try:
-            # 🔍 Run strategy to fetch buy signals
-            signals = strategy_fn(config)
-            if not signals:
-                print(f"🔕 No signals for {strategy_name}")
-                continue
-
-            for signal in signals:
-                symbol = signal["symbol"]
-                qty = signal.get("qty", 1)
-                action = signal.get("action", "buy")
-
-                # 💰 Fetch market price and place buy order
-                price = get_current_price(symbol)
-                buy_stock(symbol, qty)
+    # 🔍 Evaluate all strategies concurrently
+    with timer("buy.evaluate"):
+        results, errors = evaluate_strategies(tasks)
+    for strategy_name, e in errors.items():
+        print(f"❌ Error in strategy '{strategy_name}': {e}")
+        send_telegram(f"⚠️ Strategy error in {strategy_name}: {e}")
+    for strategy_name, signals in results.items():
+        if not signals:
+            print(f"🔕 No signals for {strategy_name}")
 
-                # 📣 Alert and log the trade
-                send_telegram(f"✅ {action.upper()} {symbol} x{qty} @ ${price:.2f}")
-                log_trade(
-                    symbol=symbol,
-                    action=action,
-                    qty=qty,
-                    price=price,
-                    strategy=strategy_name,
+    # 🏷️ One order per symbol, tagged with every strategy that signalled it
+    orders = consolidate_signals(results)
+    if orders:
+        try:
+            # 💰 Quote, place orders concurrently, then alert and log off the order path
+            with timer("buy.execute"):
+                execute_signals(
+                    orders,
+                    side="buy",
+                    strategy_name=", ".join(name for name, signals in results.items() if signals),
                     env="paper",  # Change to "live" for live orders
                     status="executed"
                 )
-
         except Exception as e:
-            print(f"❌ Error in strategy '{strategy_name}': {e}")
-            send_telegram(f"⚠️ Strategy error in {strategy_name}: {e}")
+            print(f"❌ Error placing buy orders: {e}")
+            send_telegram(f"⚠️ Buy execution error: {e}")
+
+    # 📝 Commit this job's queued trade rows and alerts before returning
+    with timer("buy.flush"):
+        if not flush_trades():
+            send_telegram("⚠️ Some buy trades could not be written to the trade log")
+        flush_notifications()
 
 
 if __name__ == "__main__":
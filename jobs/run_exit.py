@@ -1,31 +1,46 @@
 # jobs/run_exit.py
 
 from core.strategy_registry import STRATEGY_REGISTRY
-from core.broker import sell_stock, get_current_price
-from core.notifier import send_telegram
-from core.sqlite_logger import init_db, log_trade
+from core.strategy_runner import shared_quote_provider, evaluate_strategies, consolidate_signals
+from core.execution import execute_signals
+from core.notifier import send_telegram, flush_notifications
+from core.sqlite_logger import init_db, flush_trades
 from core.position_tracker import get_open_positions_by_strategy
-from core.ticker_loader import load_tickers
+from core.ticker_loader import select_tickers
+from core.instrumentation import run_context, timer
 
 # ✅ Default config for exit logic per strategy
 # Can be overridden via external JSON in the future
+# Configs without "tickers" get the universe (optionally filtered by "index",
+# "sector" or "industry"), resolved when the job runs
 DEFAULT_EXIT_CONFIGS = {
     "volume_breakout": {
         "profit_pct": 0.0001,  # Tiny threshold for testing exits
-        "loss_pct": 0.0001,
-        "tickers": load_tickers()
+        "loss_pct": 0.0001
     }
 }
 
+def get_exit_config(strategy_name: str) -> dict:
+    """
+    Default exit config for a strategy with its ticker list filled in.
+    """
+    config = dict(DEFAULT_EXIT_CONFIGS.get(strategy_name, {}))
+    config["tickers"] = select_tickers(config)
+    return config
+
+@run_context("exit")
 def run_all_exits():
     """
     Scans all registered exit strategies and executes sell signals:
     - Loads current open positions
-    - Checks exit conditions for each strategy
-    - Sells matching symbols and logs actions
+    - Quotes every strategy's holdings in one bulk request
+    - Checks exit conditions for all strategies in parallel
+    - Sells matching symbols (one order per symbol) and logs actions per strategy
+    - Appends the run's stage timings and counters to logs/metrics.jsonl
     """
     init_db()
 
+    tasks = {}
     for strategy_name, strategy_fn in STRATEGY_REGISTRY.items():
         if not hasattr(strategy_fn, "__module__"):
             continue
@@ -37,40 +52,50 @@ def run_all_exits():
             continue
 
         exit_fn = getattr(strategy_module, "run_exit")
-        config = DEFAULT_EXIT_CONFIGS.get(strategy_name, {})
+        config = get_exit_config(strategy_name)
         holdings = get_open_positions_by_strategy(strategy_name)
+        tasks[strategy_name] = (exit_fn, (config, holdings))
 
-        try:
-            # 📭 Scan for sell signals
-            exit_signals = exit_fn(config, holdings)
-            if not exit_signals:
-                print(f"📭 No exit signals for {strategy_name}")
-                continue
-
-            for signal in exit_signals:
-                symbol = signal["symbol"]
-                qty = signal.get("qty", 1)
-                action = signal.get("action", "sell")
+    # 💰 One quote request covers every strategy's holdings
+    symbols = [position["symbol"] for _, (config, holdings) in tasks.values() for position in holdings]
+    try:
+        with timer("exit.quotes"):
+            quote_provider = shared_quote_provider(symbols)
+        for _, (config, _) in tasks.values():
+            config.setdefault("quote_provider", quote_provider)
+    except Exception as e:
+        print(f"⚠️ Shared quote fetch failed, strategies will quote their own: {e}")
 
-                # 💰 Execute trade
-                price = get_current_price(symbol)
-                sell_stock(symbol, qty)
+    # 📭 Scan for sell signals across all strategies concurrently
+    with timer("exit.evaluate"):
+        results, errors = evaluate_strategies(tasks)
+    for strategy_name, e in errors.items():
+        print(f"❌ Error running exit for {strategy_name}: {e}")
+        send_telegram(f"⚠️ Exit error in {strategy_name}: {e}")
+    for strategy_name, exit_signals in results.items():
+        if not exit_signals:
+            print(f"📭 No exit signals for {strategy_name}")
 
-                # 📝 Log and notify
-                send_telegram(f"🚪 {action.upper()} {symbol} x{qty} @ ${price:.2f}")
-                log_trade(
-                    symbol=symbol,
-                    action=action,
-                    qty=qty,
-                    price=price,
-                    strategy=strategy_name,
-                    env="paper",
+    # 🏷️ One sell per symbol; each strategy's share is logged against its own position
+    orders = consolidate_signals(results)
+    if orders:
+        try:
+            with timer("exit.execute"):
+                execute_signals(
+                    orders,
+                    side="sell",
+                    strategy_name=", ".join(name for name, signals in results.items() if signals),
                     status="closed"
                 )
-
         except Exception as e:
-            print(f"❌ Error running exit for {strategy_name}: {e}")
-            send_telegram(f"⚠️ Exit error in {strategy_name}: {e}")
+            print(f"❌ Error placing sell orders: {e}")
+            send_telegram(f"⚠️ Exit execution error: {e}")
+
+    # 📝 Commit this job's queued trade rows and alerts before returning
+    with timer("exit.flush"):
+        if not flush_trades():
+            send_telegram("⚠️ Some exit trades could not be written to the trade log")
+        flush_notifications()
 
 
 if __name__ == "__main__":
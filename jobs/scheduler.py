@@ -0,0 +1,129 @@
+# jobs/scheduler.py
+
+from core.market_calendar import MARKET_TIMEZONE, is_trading_day, market_now
+from core.notifier import send_telegram, flush_notifications
+from core.sqlite_logger import flush_trades
+import schedule
+import argparse
+import signal
+import time
+import os
+
+# ✅ Default daemon timetable (market time zone)
+BUY_TIME = os.getenv("BUY_TIME", "06:00")
+EXIT_START = os.getenv("EXIT_START", "08:00")
+EXIT_END = os.getenv("EXIT_END", "18:00")
+EXIT_EVERY_MINUTES = int(os.getenv("EXIT_EVERY_MINUTES", "30"))
+
+# Longest nap between schedule checks, so shutdown stays responsive
+MAX_IDLE_SECONDS = 60
+
+_stop = False
+
+
+def exit_times(start: str = EXIT_START, end: str = EXIT_END, every_minutes: int = EXIT_EVERY_MINUTES) -> list:
+    """
+    "HH:MM" slots from start to end inclusive, every_minutes apart.
+    """
+    to_minutes = lambda hhmm: int(hhmm[:2]) * 60 + int(hhmm[3:])
+    return [f"{m // 60:02d}:{m % 60:02d}" for m in range(to_minutes(start), to_minutes(end) + 1, every_minutes)]
+
+
+def run_job(name: str, job_fn, calendar_check=is_trading_day):
+    """
+    Run one scheduled job on trading days only. Failures are reported and
+    swallowed so the daemon keeps its schedule.
+    """
+    if not calendar_check():
+        print(f"📅 Market closed today. Skipping {name}.")
+        return
+
+    started = time.perf_counter()
+    print(f"⏰ {market_now():%Y-%m-%d %H:%M} ET: running {name}...")
+    try:
+        job_fn()
+    except Exception as e:
+        print(f"❌ Scheduled {name} failed: {e}")
+        send_telegram(f"⚠️ Scheduled {name} failed: {e}")
+    finally:
+        flush_trades()
+        flush_notifications()
+    print(f"🏁 {name} finished in {time.perf_counter() - started:.1f}s")
+
+
+def build_schedule(buy_fn, exit_fn, scheduler=None, calendar_check=is_trading_day) -> schedule.Scheduler:
+    """
+    Buy once a day at BUY_TIME and exits every EXIT_EVERY_MINUTES between
+    EXIT_START and EXIT_END, all in market time.
+    """
+    scheduler = scheduler or schedule.Scheduler()
+    scheduler.every().day.at(BUY_TIME, MARKET_TIMEZONE).do(run_job, "buy", buy_fn, calendar_check).tag("buy")
+    for slot in exit_times():
+        scheduler.every().day.at(slot, MARKET_TIMEZONE).do(run_job, "exit", exit_fn, calendar_check).tag("exit")
+    return scheduler
+
+
+def warm_up():
+    """
+    Load everything a job needs up front (broker client, ticker universe,
+    strategy configs, today's calendar) so scheduled runs act immediately.
+    """
+    started = time.perf_counter()
+    from core.broker import get_api
+    from core.ticker_loader import load_tickers
+    from core.sqlite_logger import init_db
+    from core.strategy_registry import STRATEGY_REGISTRY
+    import importlib
+
+    # Strategy modules pull in pandas, numpy and the data providers
+    for strategy_fn in STRATEGY_REGISTRY.values():
+        importlib.import_module(strategy_fn.__module__)
+    get_api()
+    init_db()
+    tickers = load_tickers()
+    is_trading_day()
+    print(f"🔥 Warm-up done in {time.perf_counter() - started:.1f}s ({len(tickers)} tickers)")
+
+
+def _request_stop(signum, frame):
+    global _stop
+    _stop = True
+
+
+def run_daemon():
+    """
+    Resident replacement for the cron entries: one process keeps clients,
+    the ticker universe, caches and indicator state warm between jobs.
+    """
+    from jobs.run_buy import run_all_strategies
+    from jobs.run_exit import run_all_exits
+
+    warm_up()
+    scheduler = build_schedule(run_all_strategies, run_all_exits)
+    signal.signal(signal.SIGTERM, _request_stop)
+
+    print(f"🗓️ Scheduler running: buy at {BUY_TIME}, exits every {EXIT_EVERY_MINUTES} min {EXIT_START}-{EXIT_END} ({MARKET_TIMEZONE})")
+    print(f"Next run: {scheduler.next_run}")
+    try:
+        while not _stop:
+            scheduler.run_pending()
+            idle = scheduler.idle_seconds
+            time.sleep(min(max(idle if idle is not None else MAX_IDLE_SECONDS, 1), MAX_IDLE_SECONDS))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        flush_trades()
+        flush_notifications()
+        print("👋 Scheduler stopped.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--list", action="store_true", help="Print the job timetable and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for job in build_schedule(lambda: None, lambda: None).get_jobs():
+            print(f"{next(iter(job.tags)):<5} {job.at_time:%H:%M} {MARKET_TIMEZONE} (next run {job.next_run:%Y-%m-%d %H:%M} local)")
+    else:
+        run_daemon()
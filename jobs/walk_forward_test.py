@@ -1,2 +1,264 @@
-def run_walk_forward():
-    print("Running walk-forward testing...")
\ No newline at end of file
+# jobs/walk_forward_test.py
+
+from jobs.backtester import load_config, load_strategy_module, load_symbol_data, resolve_tickers, find_entry_positions, simulate_exits, EXIT_HORIZON
+from jobs.param_sweep import SIGNAL_PARAMS, EXIT_PARAMS, GAIN_COLUMNS, expand_grid, summarize_gains, _pool_context
+import numpy as np
+import pandas as pd
+import argparse
+import time
+import csv
+import os
+
+# Default window sizes, in trading days of the shared calendar
+DEFAULT_WALK_FORWARD = {
+    "train_days": 252,
+    "test_days": 63,
+    "step_days": 63,
+}
+
+# Market data and precomputed full-history trades, set in each worker process
+_SHARED = {}
+
+
+def build_folds(calendar: pd.DatetimeIndex, train_days: int, test_days: int, step_days: int) -> list:
+    """
+    Rolling (train_start, train_end, test_end) date triples over the calendar.
+    Windows are half-open: train is [train_start, train_end), test is [train_end, test_end).
+    """
+    folds = []
+    start = 0
+    while start + train_days + test_days <= len(calendar):
+        train_end = start + train_days
+        test_end = start + train_days + test_days
+        end_date = calendar[test_end] if test_end < len(calendar) else calendar[-1] + pd.Timedelta(days=1)
+        folds.append((calendar[start], calendar[train_end], end_date))
+        start += step_days
+    return folds
+
+
+def _init_worker(shared, strategy_name):
+    _SHARED.update(shared)
+    _SHARED["strategy_module"] = load_strategy_module(strategy_name)
+
+
+def _symbol_arrays(frames: dict) -> dict:
+    return {
+        symbol: {
+            "index": data.index,
+            "high": data["High"].to_numpy(dtype=float),
+            "low": data["Low"].to_numpy(dtype=float),
+            "close": data["Close"].to_numpy(dtype=float),
+        }
+        for symbol, data in frames.items()
+    }
+
+
+def _full_history_trades(task):
+    """
+    Entries and exits for one signal parameter set over each symbol's whole
+    history, for every exit parameter set. Folds slice these instead of
+    recomputing indicators and exits for their overlapping windows.
+    """
+    base_config, signal_params, exit_param_sets = task
+    frames = _SHARED["frames"]
+    arrays = _SHARED["arrays"]
+    strategy_module = _SHARED["strategy_module"]
+    config = {**base_config, **signal_params}
+
+    trades = {}
+    for symbol, data in frames.items():
+        entries = np.asarray(find_entry_positions(data, symbol, config, strategy_module), dtype=np.int64)
+        arr = arrays[symbol]
+        entry_prices = arr["close"][entries]
+        for exit_idx, exit_params in enumerate(exit_param_sets):
+            exit_pos, exit_prices, outcomes = simulate_exits(
+                entries, entry_prices, arr["high"], arr["low"], arr["close"],
+                exit_params["profit_pct"], exit_params["loss_pct"]
+            )
+            trades[(symbol, exit_idx)] = (entries, exit_pos, exit_prices, outcomes)
+    return trades
+
+
+def _window_gains(symbol, lookback, trades, exit_params, start_date, end_date):
+    """
+    gain_pct values and win count for entries inside [start_date, end_date),
+    matching a run_backtest() over exactly that date range: entries need a
+    full lookback inside the window and exits can't look past its last bar.
+    """
+    arr = _SHARED["arrays"][symbol]
+    lo, hi = arr["index"].searchsorted([start_date, end_date])
+    entries, exit_pos, exit_prices, outcomes = trades
+
+    mask = (entries >= lo + lookback) & (entries < hi - 1)
+    entries = entries[mask]
+    if len(entries) == 0:
+        return np.empty(0), 0
+    exit_pos, exit_prices, outcomes = exit_pos[mask], exit_prices[mask].copy(), outcomes[mask].copy()
+
+    # Full-history exits are only valid if they resolved before the window ends
+    stale = (exit_pos >= hi) | ((outcomes == "hold") & (entries + EXIT_HORIZON >= hi))
+    if stale.any():
+        _, fixed_prices, fixed_outcomes = simulate_exits(
+            entries[stale], arr["close"][entries[stale]],
+            arr["high"][:hi], arr["low"][:hi], arr["close"][:hi],
+            exit_params["profit_pct"], exit_params["loss_pct"]
+        )
+        exit_prices[stale] = fixed_prices
+        outcomes[stale] = fixed_outcomes
+
+    entry_prices = arr["close"][entries]
+    gains = np.round((exit_prices - entry_prices) / entry_prices * 100, 2)
+    return gains, int((outcomes == "win").sum())
+
+
+def _evaluate(combo_key, start_date, end_date):
+    signal_idx, exit_idx = combo_key
+    signal_params, exit_param_sets = _SHARED["groups"][signal_idx]
+    trades = _SHARED["trades"][signal_idx]
+
+    gains, wins = [], 0
+    for symbol in _SHARED["frames"]:
+        symbol_gains, symbol_wins = _window_gains(
+            symbol, signal_params["lookback_days"], trades[(symbol, exit_idx)],
+            exit_param_sets[exit_idx], start_date, end_date
+        )
+        gains.append(symbol_gains)
+        wins += symbol_wins
+    gains = np.concatenate(gains) if gains else np.empty(0)
+    return gains, wins
+
+
+def _run_fold(fold):
+    """
+    Pick the best parameter set on the train window and score it out-of-sample.
+    """
+    fold_number, (train_start, train_end, test_end) = fold
+    rank_by = _SHARED["rank_by"]
+    min_trades = _SHARED["min_trades"]
+
+    best_key, best_metrics = None, None
+    for signal_idx, (_, exit_param_sets) in enumerate(_SHARED["groups"]):
+        for exit_idx in range(len(exit_param_sets)):
+            gains, wins = _evaluate((signal_idx, exit_idx), train_start, train_end)
+            metrics = summarize_gains(gains.tolist(), wins)
+            if metrics["trades"] < min_trades:
+                continue
+            if best_metrics is None or metrics[rank_by] > best_metrics[rank_by]:
+                best_key, best_metrics = (signal_idx, exit_idx), metrics
+
+    if best_key is None:
+        return None
+
+    test_gains, test_wins = _evaluate(best_key, train_end, test_end)
+    signal_params, exit_param_sets = _SHARED["groups"][best_key[0]]
+    row = {
+        "fold": fold_number,
+        "train_start": train_start.strftime("%Y-%m-%d"),
+        "test_start": train_end.strftime("%Y-%m-%d"),
+        "test_end": test_end.strftime("%Y-%m-%d"),
+        **signal_params,
+        **exit_param_sets[best_key[1]],
+        f"train_{rank_by}": best_metrics[rank_by],
+        **summarize_gains(test_gains.tolist(), test_wins),
+    }
+    return row, test_gains, test_wins
+
+
+def run_walk_forward(config, workers=None):
+    """
+    Walk-forward optimization: roll train/test windows across the history,
+    grid-search config["grid"] on each train window and score the winner on
+    the following test window with run_backtest() semantics.
+    Writes backtest_results/walk_forward_<strategy>.csv.
+    """
+    print("Running walk-forward testing...")
+    strategy_name = config["strategy"]
+    tickers = resolve_tickers(config)
+    rank_by = config.get("rank_by", "avg_return")
+    # Folds are scored from per-trade gains only
+    if rank_by not in GAIN_COLUMNS:
+        raise ValueError(f"Walk-forward can only rank by {', '.join(GAIN_COLUMNS)}, not {rank_by}")
+    windows = {**DEFAULT_WALK_FORWARD, **config.get("walk_forward", {})}
+    workers = workers or config.get("workers") or os.cpu_count()
+
+    load_strategy_module(strategy_name)
+    frames = load_symbol_data(tickers, config)
+    if not frames:
+        print("⚠️ No market data loaded. Nothing to test.")
+        return
+
+    calendar = pd.DatetimeIndex(sorted(set().union(*(data.index for data in frames.values()))))
+    folds = build_folds(calendar, windows["train_days"], windows["test_days"], windows["step_days"])
+    if not folds:
+        print(f"⚠️ Only {len(calendar)} trading days of data; not enough for one train/test fold.")
+        return
+
+    combos = expand_grid(config.get("grid", {}), config)
+    grouped = {}
+    for combo in combos:
+        key = tuple((name, combo[name]) for name in SIGNAL_PARAMS)
+        grouped.setdefault(key, []).append({name: combo[name] for name in EXIT_PARAMS})
+    groups = [(dict(key), exit_sets) for key, exit_sets in grouped.items()]
+
+    print(f"🧭 {len(folds)} folds × {len(combos)} combinations over {len(frames)} symbols with {workers} workers...")
+    started = time.perf_counter()
+
+    shared = {
+        "frames": frames,
+        "arrays": _symbol_arrays(frames),
+        "groups": groups,
+        "rank_by": rank_by,
+        "min_trades": config.get("min_trades", 1),
+    }
+    ctx = _pool_context()
+
+    # Pass 1: signals and exits once per parameter set over the whole history
+    tasks = [(config, signal_params, exit_sets) for signal_params, exit_sets in groups]
+    with ctx.Pool(processes=min(workers, len(tasks)), initializer=_init_worker, initargs=(shared, strategy_name)) as pool:
+        shared["trades"] = pool.map(_full_history_trades, tasks)
+
+    # Pass 2: folds in parallel, each slicing the shared full-history trades
+    with ctx.Pool(processes=min(workers, len(folds)), initializer=_init_worker, initargs=(shared, strategy_name)) as pool:
+        fold_results = pool.map(_run_fold, list(enumerate(folds, start=1)))
+
+    rows, all_gains, all_wins = [], [], 0
+    for result in fold_results:
+        if result is None:
+            continue
+        row, test_gains, test_wins = result
+        rows.append(row)
+        all_gains.append(test_gains)
+        all_wins += test_wins
+
+    if not rows:
+        print("⚠️ No fold produced enough trades to pick parameters.")
+        return
+
+    os.makedirs("backtest_results", exist_ok=True)
+    results_file = os.path.join("backtest_results", f"walk_forward_{strategy_name}.csv")
+    fieldnames = ["fold", "train_start", "test_start", "test_end"] + SIGNAL_PARAMS + EXIT_PARAMS + [f"train_{rank_by}"] + GAIN_COLUMNS
+    with open(results_file, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    oos = summarize_gains(np.concatenate(all_gains).tolist(), all_wins)
+    elapsed = time.perf_counter() - started
+    print(f"\n🏁 Walk-forward finished in {elapsed:.1f}s → {results_file}")
+    print("📈 Out-of-sample summary:")
+    print(f"Folds: {len(rows)}")
+    print(f"Total trades: {oos['trades']}")
+    print(f"Win rate: {oos['win_rate']:.2f}%")
+    print(f"Avg return: {oos['avg_return']:.2f}%")
+
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", required=True, help="Path to sweep config JSON file (grid + walk_forward windows)")
+    parser.add_argument("--workers", type=int, help="Number of worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    run_walk_forward(config, workers=args.workers)
@@ -1,17 +1,23 @@
 # main.py
 
 import sys
-from jobs.run_buy import run_all_strategies as run_buy
-from jobs.run_exit import run_all_exits as run_sell
+
+# Jobs are imported per mode, so each command only loads what it uses
 
 if __name__ == "__main__":
     mode = sys.argv[1] if len(sys.argv) > 1 else "buy"
 
     if mode == "buy":
         print("🔄 Running BUY logic...")
+        from jobs.run_buy import run_all_strategies as run_buy
         run_buy()
     elif mode == "sell":
         print("🔄 Running SELL logic...")
+        from jobs.run_exit import run_all_exits as run_sell
         run_sell()
+    elif mode == "daemon":
+        print("🔄 Starting scheduler daemon...")
+        from jobs.scheduler import run_daemon
+        run_daemon()
     else:
-        print(f"❌ Unknown mode '{mode}'. Use 'buy' or 'sell'.")
+        print(f"❌ Unknown mode '{mode}'. Use 'buy', 'sell' or 'daemon'.")
@@ -1,41 +1,56 @@
 # strategies/high_volume_breakout.py
 
+import datetime
+import math
+import numpy as np
 import pandas as pd
-from core.data_provider import get_daily_data
+from core.data_provider import get_daily_panel, stream_intraday_bars, INTRADAY_INTERVALS, MARKET_CLOSE
+from core.quotes import get_quotes, DEFAULT_QUOTE_SOURCE
+from core.indicators import RollingMean, rolling_mean, load_states, save_states
+
+# ✅ Market data this strategy reads (used to build one shared fetch for all strategies)
+def data_requirements(config: dict) -> dict:
+    return {
+        "lookback_days": config.get("lookback_days", 5),
+        "interval": "1d",
+        "source": config.get("data_source", "yfinance"),
+    }
 
 # ✅ Buy signal strategy logic
 
-def run(config: dict) -> list:
+def run(config: dict, panel=None) -> list:
     """
     Run the volume breakout BUY strategy.
-    Uses get_daily_data() interface to abstract away the data source (e.g., yfinance, alpaca).
+    Reads from `panel` when the caller already fetched data for several
+    strategies; otherwise uses get_daily_panel() to abstract away the data
+    source (e.g., yfinance, alpaca).
     """
     tickers = config.get("tickers", [])
     volume_multiplier = config.get("volume_multiplier", 2.0)
-    period = config.get("period", "6d")
     lookback = config.get("lookback_days", 5)
     signals = []
 
-    # Fetch OHLCV data for each ticker
-    data_map = get_daily_data(tickers, start=None, end=None, source=config.get("data_source", "yfinance"))
+    if panel is None:
+        # Fetch just enough recent daily bars to cover the lookback window
+        start = (datetime.date.today() - datetime.timedelta(days=lookback * 2 + 10)).isoformat()
+        panel = get_daily_panel(tickers, start=start, end=None, source=config.get("data_source", "yfinance"))
+
+    # Rolling volume averages carried over from the previous run
+    state_name = config.get("state_name", "volume_breakout")
+    states = load_states(state_name)
 
     for symbol in tickers:
-        data = data_map.get(symbol)
-        if data is None or data.empty or len(data) <= lookback:
+        if symbol not in panel:
             continue
 
-        recent_volume = data["Volume"].iloc[-1]
-        avg_volume = data["Volume"].iloc[-lookback - 1:-1].mean()
-
-        # ✅ Type-safe fallback
-        if isinstance(recent_volume, pd.Series):
-            recent_volume = recent_volume.iloc[0]
-        if isinstance(avg_volume, pd.Series):
-            avg_volume = avg_volume.iloc[0]
+        volume = panel.history(symbol, "Volume")
+        valid = ~np.isnan(volume)
+        volume, dates = volume[valid], panel.dates[valid]
+        if len(volume) <= lookback:
+            continue
 
-        # ✅ Convert to float explicitly
-        recent_volume = float(recent_volume)
-        avg_volume = float(avg_volume)
+        recent_volume = float(volume[-1])
+        avg_volume = _advance_average(states, symbol, dates, volume, lookback)
 
         if recent_volume >= volume_multiplier * avg_volume:
             signals.append({
@@ -44,8 +59,32 @@ def run(config: dict) -> list:
                 "qty": 1
             })
 
+    save_states(state_name, states)
     return signals
 
+def _advance_average(states: dict, symbol: str, dates, volume, lookback: int) -> float:
+    """
+    Average volume of the `lookback` bars before the latest one.
+    The saved state covers bars up to its "as_of" date, so a daily run only
+    feeds the bars since then (usually one). The latest bar is left out of
+    the state because it may still be revised. Missing or stale state is
+    rebuilt from the fetched history.
+    """
+    average, start = None, 0
+    saved = states.get(symbol)
+    if saved and saved["state"]["window"] == lookback:
+        pos = dates.searchsorted(pd.Timestamp(saved["as_of"]))
+        if pos < len(dates) - 1 and dates[pos] == pd.Timestamp(saved["as_of"]):
+            average, start = RollingMean.from_state(saved["state"]), pos + 1
+
+    if average is None:
+        average = RollingMean(lookback)
+    for value in volume[start:-1]:
+        average.update(value)
+
+    states[symbol] = {"as_of": dates[-2].strftime("%Y-%m-%d"), "state": average.state()}
+    return average.value
+
 # ✅ Buy signal for backtest simulation (on one day of data)
 def run_backtest_on_day(data: pd.DataFrame, symbol: str, config: dict) -> dict | None:
     volume_multiplier = config.get("volume_multiplier", 1.0)
@@ -74,40 +113,159 @@ def run_backtest_on_day(data: pd.DataFrame, symbol: str, config: dict) -> dict |
 
     return None
 
-# ✅ Exit logic (e.g., sell when price drops 3% from peak)
+# ✅ Vectorized buy signals over a symbol's whole history (used by the backtester)
+def generate_signals(data: pd.DataFrame, config: dict) -> pd.Series:
+    """
+    Return a boolean Series aligned to data.index that is True on every bar where
+    run_backtest_on_day() would fire when handed the trailing lookback window.
+    The average excludes the current bar, hence the one-bar shift.
+    """
+    lookback = config.get("lookback_days", 5)
+    volume = data["Volume"]
+    if isinstance(volume, pd.DataFrame):
+        volume = volume.iloc[:, 0]
+    volume = volume.astype(float)
+
+    if lookback < 1:
+        return pd.Series(False, index=data.index)
+
+    avg_volume = rolling_mean(volume, lookback).shift(1)
+    return volume >= config["volume_multiplier"] * avg_volume
+
+# ✅ Intraday volume spikes (streamed bar by bar)
+class IntradayVolumeSpike:
+    """
+    Flags a bar whose volume is at least `volume_multiplier` times the average
+    of the symbol's previous `lookback_bars` bars. Each symbol keeps a
+    RollingMean, so a new bar costs O(1) instead of a rescan of the session.
+    """
+
+    def __init__(self, volume_multiplier: float = 3.0, lookback_bars: int = 20):
+        self.volume_multiplier = volume_multiplier
+        self.lookback_bars = lookback_bars
+        self.averages = {}
+
+    def update(self, symbol: str, volume: float) -> bool:
+        average = self.averages.get(symbol)
+        if average is None:
+            average = self.averages[symbol] = RollingMean(self.lookback_bars)
+        baseline = average.value
+        average.update(volume)
+        return not math.isnan(baseline) and volume >= self.volume_multiplier * baseline
+
+    def state(self) -> dict:
+        return {
+            "volume_multiplier": self.volume_multiplier,
+            "lookback_bars": self.lookback_bars,
+            "averages": {symbol: average.state() for symbol, average in self.averages.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "IntradayVolumeSpike":
+        detector = cls(state["volume_multiplier"], state["lookback_bars"])
+        detector.averages = {symbol: RollingMean.from_state(saved) for symbol, saved in state["averages"].items()}
+        return detector
+
+def run_intraday(config: dict, bars=None) -> list:
+    """
+    Scan intraday bars for volume spikes and return BUY signals (one per symbol).
+    `bars` is any (timestamp, {symbol: bar}) stream, e.g. a replay from
+    stream_intraday_bars(). Without it, today's bars are fetched fresh
+    (bypassing the minute cache) and streamed live: each symbol picks up
+    after the last of its bars a previous call processed (state, including
+    which symbols already signalled, is saved per session), and bars its
+    data doesn't show as finished yet are left for the next call.
+    """
+    tickers = config.get("tickers", [])
+    interval = config.get("intraday_interval", "5m")
+    detector = IntradayVolumeSpike(config.get("intraday_multiplier", 3.0), config.get("intraday_lookback_bars", 20))
+    state_name = f"{config.get('state_name', 'volume_breakout')}_intraday"
+
+    live = bars is None
+    as_of, session, signalled = {}, None, set()
+    if live:
+        from core.market_calendar import market_now
+        now = pd.Timestamp(market_now())
+        session = now.date().isoformat()
+        saved = load_states(state_name)
+        if saved.get("session") == session and saved.get("interval") == interval and isinstance(saved.get("as_of"), dict):
+            detector = IntradayVolumeSpike.from_state(saved["detector"])
+            as_of = saved["as_of"]
+            signalled = set(saved.get("signalled", []))
+        # ✅ Once the session is over (plus one bar for late prints) the last bar is final too
+        session_over = now >= now.normalize() + MARKET_CLOSE + pd.Timedelta(INTRADAY_INTERVALS[interval])
+        bars = stream_intraday_bars(
+            tickers, start=session, interval=interval,
+            source=config.get("data_source", "yfinance"), use_cache=False,
+            after=as_of, complete_only=not session_over
+        )
+
+    signals = []
+    for timestamp, bar_map in bars:
+        for symbol, bar in bar_map.items():
+            if detector.update(symbol, bar["Volume"]) and symbol not in signalled:
+                signalled.add(symbol)
+                signals.append({
+                    "symbol": symbol,
+                    "action": "buy",
+                    "qty": 1,
+                    "timestamp": timestamp.isoformat()
+                })
+            as_of[symbol] = timestamp.isoformat()
+
+    if live:
+        save_states(state_name, {
+            "session": session,
+            "interval": interval,
+            "as_of": as_of,
+            "signalled": sorted(signalled),
+            "detector": detector.state()
+        })
+    return signals
+
+# ✅ Exit logic (sell on profit target or stop loss)
 def run_exit(config: dict, holdings: list) -> list:
     """
     Evaluate exit (SELL) signals based on target profit/loss thresholds.
-    Still uses yfinance intraday 1-min data for simplicity.
+    Prices for all holdings come from one bulk quote request: the source named by
+    config["quote_source"] (broker snapshot by default), or any callable passed as
+    config["quote_provider"] (e.g. core.fakes.FakeQuoteProvider).
     """
-    import yfinance as yf
     exit_signals = []
     profit_target = config.get("profit_pct", 0.05)  # 5% gain
     stop_loss = config.get("loss_pct", 0.03)       # 3% drop
 
+    if not holdings:
+        return exit_signals
+
+    quote_fn = config.get("quote_provider")
+    symbols = [position["symbol"] for position in holdings]
+    try:
+        if quote_fn is not None:
+            prices = quote_fn(symbols)
+        else:
+            prices = get_quotes(symbols, source=config.get("quote_source", DEFAULT_QUOTE_SOURCE))
+    except Exception as e:
+        print(f"⚠️ Could not fetch quotes for exits: {e}")
+        return exit_signals
+
     for position in holdings:
         symbol = position["symbol"]
         entry_price = float(position["price"])
         qty = position["qty"]
 
-        try:
-            data = yf.download(symbol, period="1d", interval="1m", auto_adjust=False)
-            if data is None or data.empty:
-                continue
-            val = data["Close"].iloc[-1]
-            if isinstance(val, pd.Series):
-                val = val.iloc[0]
-            current_price = float(val)
-            gain = (current_price - entry_price) / entry_price
-
-            if gain >= profit_target or gain <= -stop_loss:
-                exit_signals.append({
-                    "symbol": symbol,
-                    "action": "sell",
-                    "qty": qty
-                })
+        current_price = prices.get(symbol)
+        if current_price is None:
+            print(f"⚠️ Could not evaluate exit for {symbol}: no quote")
+            continue
+
+        gain = (float(current_price) - entry_price) / entry_price
 
-        except Exception as e:
-            print(f"⚠️ Could not evaluate exit for {symbol}: {e}")
+        if gain >= profit_target or gain <= -stop_loss:
+            exit_signals.append({
+                "symbol": symbol,
+                "action": "sell",
+                "qty": qty
+            })
 
     return exit_signals
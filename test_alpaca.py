@@ -1,4 +1,4 @@
-from core.broker import api, get_current_price
+from core.broker import api, get_current_price, get_latest_prices
 
 # Check account info
 account = api.get_account()
@@ -10,3 +10,8 @@ print(f"🧾 Account equity: ${account.equity}")
 symbol = "AAPL"
 price = get_current_price(symbol)
 print(f"📈 Last trade price for {symbol}: ${price}")
+
+# Get latest prices for several stocks in one request
+prices = get_latest_prices(["AAPL", "MSFT", "NVDA"])
+for symbol, price in prices.items():
+    print(f"📈 Snapshot price for {symbol}: ${price}")
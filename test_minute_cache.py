@@ -0,0 +1,45 @@
+# test_minute_cache.py
+# Offline check that a minute session cached mid-day is refetched after the date rolls over
+
+import tempfile
+import numpy as np
+import pandas as pd
+from core.data_cache import MinuteBarCache
+
+TIMEZONE = "America/New_York"
+
+
+def _session(day: str, minutes: int) -> pd.DataFrame:
+    index = pd.Timestamp(f"{day} 09:30", tz=TIMEZONE) + pd.to_timedelta(np.arange(minutes), unit="min")
+    return pd.DataFrame({"Close": 100.0, "Volume": 1000.0}, index=index)
+
+
+def test_partial_session_refetched_after_rollover():
+    day = pd.Timestamp("2026-10-15").date()
+    clock = {"now": pd.Timestamp("2026-10-15 11:00", tz=TIMEZONE).timestamp()}
+    cache = MinuteBarCache("test", root=tempfile.mkdtemp(), timezone=TIMEZONE, clock=lambda: clock["now"])
+    fetches = []
+
+    def fetch(symbols, start, end):
+        fetches.append((tuple(symbols), start, end))
+        return {symbol: _session("2026-10-15", 390) for symbol in symbols}
+
+    # 11:00 on the day: only the first 91 minutes exist yet
+    cache.store("AAA", day, _session("2026-10-15", 91))
+    assert len(cache.load("AAA", day)) == 91
+
+    # Next day: the partial session must not pass for a finished one
+    clock["now"] = pd.Timestamp("2026-10-16 10:00", tz=TIMEZONE).timestamp()
+    assert cache.load("AAA", day) is None
+    (_, frames), = list(cache.iter_days(["AAA"], [day], fetch))
+    assert len(frames["AAA"]) == 390 and len(fetches) == 1
+
+    # Saved after the close, so it is final and served without another fetch
+    (_, frames), = list(cache.iter_days(["AAA"], [day], fetch))
+    assert len(frames["AAA"]) == 390 and len(fetches) == 1
+    assert "session_complete" not in frames["AAA"].attrs
+
+
+if __name__ == "__main__":
+    test_partial_session_refetched_after_rollover()
+    print("✅ Partial minute sessions are refetched after the day rolls over")